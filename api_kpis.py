@@ -0,0 +1,177 @@
+"""API de solo lectura con los KPIs de los proyectos (JSON).
+
+Corre aparte del dashboard y lee la misma BD (db_proyectos.json):
+
+    python api_kpis.py --puerto 8502 --db db_proyectos.json
+
+    GET /api/proyectos
+    GET /api/proyectos/<nombre>/kpis
+    GET /api/proyectos/<nombre>/trend
+    GET /api/proyectos/<nombre>/criticos
+
+Cada respuesta lleva ETag (id + fecha_carga del proyecto); si el cliente
+manda If-None-Match con el mismo valor se responde 304 sin cuerpo.
+"""
+import os
+import json
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, quote
+
+from items_compactos import desde_dias_epoca
+
+DB_FILE = "db_proyectos.json"
+RECURSOS = ["kpis", "trend", "criticos"]
+
+
+def _iso(d):
+    # Fechas guardadas como días; una BD vieja puede traer texto
+    if isinstance(d, int):
+        return desde_dias_epoca(d).isoformat()
+    return d
+
+
+def kpis_resumen(r: dict) -> dict:
+    # Mismos cálculos que las tarjetas del dashboard
+    total = int(r.get("total_registros", 0))
+    conteo_general = r.get("conteo_general", {}) or {}
+    completados = int(conteo_general.get("COMPLETADO", 0))
+    return {
+        "total_registros": total,
+        "conteo_general": conteo_general,
+        "sin_oc_real": int(r.get("sin_oc_real", 0)),
+        "avance_pct": round(completados * 100.0 / total, 1) if total else 0.0,
+    }
+
+
+def _etag(*partes) -> str:
+    return '"' + hashlib.sha1("|".join(str(p) for p in partes).encode()).hexdigest()[:20] + '"'
+
+
+def _cuerpo(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+
+
+class Almacen:
+    """Respuestas ya serializadas; se recargan solo si cambia el archivo de la BD."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._firma = None
+        self._lock = threading.Lock()
+        self.lista = (_etag("vacio"), _cuerpo([]))
+        self.respuestas = {}   # (nombre, recurso) -> (etag, cuerpo)
+
+    def _cargar(self) -> bool:
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                proyectos = json.load(f)
+        except FileNotFoundError:
+            proyectos = []
+        except (OSError, ValueError):
+            # BD a medio escribir: se quedan las respuestas anteriores
+            return False
+
+        respuestas, lista = {}, []
+        for p in proyectos:
+            nombre = p.get("nombre", "")
+            r = p.get("resumen", {})
+            version = (p.get("id", ""), p.get("fecha_carga", ""))
+            base = {"nombre": nombre, "fecha_carga": p.get("fecha_carga")}
+            datos = {
+                "kpis": {**base, **kpis_resumen(r)},
+                "trend": {**base, "trend": [
+                    {"semana": _iso(t.get("SEMANA")), "solicitudes": t.get("solicitudes", 0)}
+                    for t in r.get("trend", [])
+                ]},
+                "criticos": {**base, "criticos": [
+                    {**c, "Fecha prometida": _iso(c.get("Fecha prometida"))}
+                    for c in r.get("criticos", [])
+                ]},
+            }
+            for recurso, obj in datos.items():
+                respuestas[(nombre, recurso)] = (_etag(*version, recurso), _cuerpo(obj))
+            lista.append({
+                **base,
+                "archivo": p.get("archivo"),
+                # safe="": un "/" en el nombre ("OBRA 12/2024") partiría la ruta
+                "urls": {rec: f"/api/proyectos/{quote(nombre, safe='')}/{rec}" for rec in RECURSOS},
+            })
+
+        self.respuestas = respuestas
+        self.lista = (_etag(*sorted(str((p["nombre"], p["fecha_carga"])) for p in lista)), _cuerpo(lista))
+        return True
+
+    def refrescar(self):
+        try:
+            st = os.stat(self.ruta)
+            firma = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            firma = None
+        if firma != self._firma:
+            with self._lock:
+                # Sin firma nueva si no se pudo leer: la siguiente petición reintenta
+                if firma != self._firma and self._cargar():
+                    self._firma = firma
+
+    def obtener(self, ruta_url: str):
+        self.refrescar()
+        partes = [unquote(x) for x in ruta_url.strip("/").split("/")]
+        if partes == ["api", "proyectos"]:
+            return self.lista
+        if len(partes) == 4 and partes[:2] == ["api", "proyectos"]:
+            return self.respuestas.get((partes[2], partes[3]))
+        return None
+
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # conexiones keep-alive
+    disable_nagle_algorithm = True  # encabezados y cuerpo salen en escrituras separadas
+    almacen: Almacen = None
+
+    def do_GET(self):
+        res = self.almacen.obtener(self.path.split("?", 1)[0])
+        if res is None:
+            return self._responder(404, None, _cuerpo({"error": "No encontrado"}))
+        etag, cuerpo = res
+        if etag in [x.strip() for x in self.headers.get("If-None-Match", "").split(",")]:
+            return self._responder(304, etag, b"")
+        self._responder(200, etag, cuerpo)
+
+    def _responder(self, codigo: int, etag, cuerpo: bytes):
+        self.send_response(codigo)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if codigo != 304:
+            # Un 304 no lleva cuerpo ni Content-Length (sería el del 200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        if cuerpo:
+            self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def crear_servidor(db: str = DB_FILE, host: str = "127.0.0.1", puerto: int = 8502) -> ThreadingHTTPServer:
+    manejador = type("Manejador", (ManejadorAPI,), {"almacen": Almacen(db)})
+    return ThreadingHTTPServer((host, puerto), manejador)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="API JSON de KPIs de proyectos")
+    ap.add_argument("--db", default=DB_FILE)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--puerto", type=int, default=8502)
+    args = ap.parse_args()
+
+    servidor = crear_servidor(args.db, args.host, args.puerto)
+    print(f"API en http://{args.host}:{args.puerto}/api/proyectos (BD: {args.db})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -4,8 +4,22 @@ import datetime as dt
 import os
 import json
 import re
+import time
 import plotly.graph_objects as go
 from io import BytesIO
+from functools import partial
+
+from items_compactos import (
+    ItemsCompactos, ESTADOS_ORDEN, CODIGO_ESTADO,
+    a_dias_epoca, dia_json, hoy_dias_epoca, fechas_desde_dias,
+)
+from busqueda import IndiceBusqueda
+from indice_proyectos import IndiceProyectos
+from exportar import exportar
+from retrasos import analizar_retrasos
+from disenos_excel import RegistroDisenos, DISENOS_FILE, limpiar_columna, columna_descripcion
+from tendencias import construir_tendencias, con_ceros, CLASES_GENERALES, GRANULARIDADES, SERIES_FECHA
+from vencidos import publicar_colas
 
 # =========================
 # CONFIG
@@ -38,40 +52,66 @@ def cargar_datos():
     if os.path.exists(DB_FILE):
         try:
             with open(DB_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+                proyectos = json.load(f)
         except:
             return []
+        for p in proyectos:
+            r = p.get("resumen", {})
+            # Sin servicios desde la carga: las posiciones del índice de búsqueda no cambian
+            r["items"] = filtrar_items_servicios(r.get("items", []))
+            normalizar_fechas_resumen(r)
+        return proyectos
     return []
 
-def guardar_datos(lista_proyectos):
-    with open(DB_FILE, "w", encoding="utf-8") as f:
-        json.dump(lista_proyectos, f, ensure_ascii=False, indent=2, default=str)
+def normalizar_fechas_resumen(r: dict):
+    # BD vieja: fechas de críticos y tendencia como texto -> días desde 1970-01-01
+    for c in r.get("criticos", []):
+        if "Prometida" in c and "Fecha prometida" not in c:
+            c["Fecha prometida"] = c.pop("Prometida")
+        f = c.get("Fecha prometida")
+        if isinstance(f, str):
+            try:
+                c["Fecha prometida"] = a_dias_epoca(dt.datetime.strptime(f.strip(), "%d/%m/%Y"))
+            except ValueError:
+                c["Fecha prometida"] = None
+    for t in r.get("trend", []):
+        if isinstance(t.get("SEMANA"), str):
+            t["SEMANA"] = dia_json(a_dias_epoca(t["SEMANA"]))
+
+def _json_default(o):
+    if isinstance(o, ItemsCompactos):
+        return o.a_json()
+    return str(o)
 
-def upsert_proyecto(lista, nuevo):
-    nombre = nuevo["nombre"]
-    out = [p for p in lista if p.get("nombre") != nombre]
-    out.append(nuevo)
-    return out
+def guardar_datos(lista_proyectos):
+    # Temporal + os.replace: api_kpis.py y vencidos.py leen la misma BD y
+    # nunca deben ver un JSON a medio escribir
+    tmp = DB_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(list(lista_proyectos), f, ensure_ascii=False, indent=2, default=_json_default)
+    os.replace(tmp, DB_FILE)
+    # Colas del resumen de vencidos: el job lee estas y no la BD completa
+    publicar_colas(lista_proyectos, DB_FILE)
 
 def dedup_items_por_clave(items, keys):
+    items = ItemsCompactos.desde_json(items)
     seen = set()
-    out = []
-    for it in items:
-        k = tuple(str(it.get(x, "")).strip() for x in keys)
+    keep = []
+    for i, k in enumerate(zip(*(items.texto[x] for x in keys))):
         if k in seen:
             continue
         seen.add(k)
-        out.append(it)
-    return out
+        keep.append(i)
+    return items if len(keep) == len(items) else items.seleccionar(keep)
 
 # =========================
 # UTILIDADES
 # =========================
 def dias_restantes(fecha_prometida):
-    hoy = pd.Timestamp.today().normalize()
-    if pd.isna(fecha_prometida):
+    # fecha_prometida en días desde 1970-01-01
+    if fecha_prometida is None:
         return None
-    return int((pd.Timestamp(fecha_prometida).normalize() - hoy).days)
+    return int(fecha_prometida - hoy_dias_epoca())
 
 def safe_int(x, default=0):
     try:
@@ -85,12 +125,13 @@ def is_empty_oc(v):
     s = str(v).strip().lower()
     return s in ["", "0", "0.0", "nan", "none"]
 
-def item_es_servicio(it: dict) -> bool:
-    desc = str(it.get("descripcion", "") or "")
-    return bool(SERVICIO_RE.search(desc))
+def filtrar_items_servicios(items) -> ItemsCompactos:
+    items = ItemsCompactos.desde_json(items or [])
+    keep = [i for i, desc in enumerate(items.texto["descripcion"]) if not SERVICIO_RE.search(desc)]
+    return items if len(keep) == len(items) else items.seleccionar(keep)
 
-def filtrar_items_servicios(items: list) -> list:
-    return [it for it in (items or []) if not item_es_servicio(it)]
+def contar_sin_oc(items: ItemsCompactos) -> int:
+    return sum(1 for v in items.texto["no_oc"] if is_empty_oc(v))
 
 def style_light_table(df: pd.DataFrame):
     # st.dataframe soporta pandas.Styler [web:425]
@@ -121,8 +162,19 @@ def style_light_table(df: pd.DataFrame):
 # =========================
 # ESTADO
 # =========================
+@st.cache_resource(show_spinner=False)
+def indice_busqueda(_proyectos) -> IndiceBusqueda:
+    # Uno por proceso para todas las sesiones. Se arma en otro hilo desde la
+    # primera ejecución del script (pantalla de entrada), no con la primera
+    # búsqueda; después solo lo actualiza el guardado del admin
+    indice = IndiceBusqueda()
+    indice.sincronizar_en_fondo(list(_proyectos))
+    return indice
+
 if "proyectos" not in st.session_state:
-    st.session_state.proyectos = cargar_datos()
+    # Indexados por nombre; si la BD trae nombres repetidos queda el último
+    st.session_state.proyectos = IndiceProyectos(cargar_datos())
+indice_busqueda(st.session_state.proyectos)
 if "modo" not in st.session_state:
     st.session_state.modo = None
 if "admin_ok" not in st.session_state:
@@ -136,8 +188,13 @@ if "login_error" not in st.session_state:
 # =========================
 # LECTURA EXCEL
 # =========================
+@st.cache_resource
+def registro_disenos() -> RegistroDisenos:
+    # Compartido entre sesiones; se persiste en DISENOS_FILE
+    return RegistroDisenos(DISENOS_FILE)
+
 def leer_nombre_proyecto_excel(file_bytes: bytes) -> str:
-    df0 = pd.read_excel(BytesIO(file_bytes), header=None, engine="openpyxl")
+    df0 = pd.read_excel(BytesIO(file_bytes), header=None, nrows=4, engine="openpyxl")  # solo hasta C4
     nombre = str(df0.iloc[3, 2]).strip()  # C4
     nombre = nombre.replace("NOMBRE DEL PROYECTO", "").replace(":", "").strip()
     if nombre.lower() in ["nan", "none", ""]:
@@ -145,6 +202,12 @@ def leer_nombre_proyecto_excel(file_bytes: bytes) -> str:
     return nombre
 
 def leer_tabla_excel(file_bytes: bytes) -> pd.DataFrame:
+    # Diseño ya visto: solo las columnas usadas desde la fila conocida
+    registro = registro_disenos()
+    df, primeras = registro.leer(file_bytes)
+    if df is not None:
+        return df
+
     raw = pd.read_excel(BytesIO(file_bytes), header=None, engine="openpyxl")
     header_row = None
     for i in range(len(raw)):
@@ -156,15 +219,17 @@ def leer_tabla_excel(file_bytes: bytes) -> pd.DataFrame:
         raise ValueError("No se encontró el encabezado 'No. S.C.' en el Excel.")
 
     df = pd.read_excel(BytesIO(file_bytes), header=header_row, engine="openpyxl")
-    df.columns = [str(c).replace("\n", " ").strip() for c in df.columns]
+    df.columns = [limpiar_columna(c) for c in df.columns]
+    registro.aprender(primeras, header_row, list(df.columns))
     return df
 
 def filtrar_servicios(df: pd.DataFrame) -> pd.DataFrame:
     col_desc = "DESCRIPCION DE LA PARTIDA"
     if col_desc not in df.columns:
-        cand = [c for c in df.columns if "DESCRIPCION" in c.upper() and "PARTIDA" in c.upper()]
+        # Con un diseño registrado ya viene renombrada desde la lectura
+        cand = columna_descripcion(list(df.columns))
         if cand:
-            df = df.rename(columns={cand[0]: col_desc})
+            df = df.rename(columns={cand: col_desc})
         else:
             raise ValueError("No existe la columna 'DESCRIPCION DE LA PARTIDA'.")
 
@@ -175,8 +240,6 @@ def filtrar_servicios(df: pd.DataFrame) -> pd.DataFrame:
 # =========================
 # ESTATUS
 # =========================
-ESTADOS_ORDEN = ["COMPLETADO", "PENDIENTE A LLEGAR", "SIN PEDIDO", "CANCELADO"]
-
 def map_estatus_sc(valor):
     v = str(valor).strip().upper()
     if v == "A":
@@ -198,40 +261,39 @@ def map_estatus_oc(valor):
 # =========================
 # RESUMEN (dona + tendencia semanal)
 # =========================
-def clase_general_from_item(it: dict) -> str:
-    no_oc = it.get("no_oc", "")
-    est_sc = str(it.get("estatus_sc", "")).upper().strip()
-    est_oc = str(it.get("estatus_oc", "")).upper().strip()
-
-    if is_empty_oc(no_oc):
-        return "SIN OC"
-    if "CANCEL" in est_sc or "CANCEL" in est_oc:
-        return "CANCELADO"
-    if est_sc == "CANCELADO" or est_oc == "CANCELADO":
-        return "CANCELADO"
-    if est_sc == "COMPLETADO" or est_oc == "COMPLETADO":
-        return "COMPLETADO"
-    return "PENDIENTE A LLEGAR"
+def clases_generales(items: ItemsCompactos) -> list:
+    # Estatus ya vienen codificados sobre ESTADOS_ORDEN
+    cancelado = CODIGO_ESTADO["CANCELADO"]
+    completado = CODIGO_ESTADO["COMPLETADO"]
+    out = []
+    for no_oc, sc, oc in zip(items.texto["no_oc"], items.estado["estatus_sc"], items.estado["estatus_oc"]):
+        if is_empty_oc(no_oc):
+            out.append("SIN OC")
+        elif sc == cancelado or oc == cancelado:
+            out.append("CANCELADO")
+        elif sc == completado or oc == completado:
+            out.append("COMPLETADO")
+        else:
+            out.append("PENDIENTE A LLEGAR")
+    return out
 
-def construir_conteo_general_y_trend_desde_items(items: list) -> tuple[dict, list]:
+def construir_conteo_general_y_trend_desde_items(items) -> tuple[dict, list]:
     items = filtrar_items_servicios(items)
-    if not items:
+    if not len(items):
         return {}, []
 
-    df = pd.DataFrame(items).copy()
-    df["clase_general"] = df.apply(lambda r: clase_general_from_item(r.to_dict()), axis=1)
-    conteo_general = df["clase_general"].value_counts(dropna=False).to_dict()
+    conteo_general = pd.Series(clases_generales(items)).value_counts(dropna=False).to_dict()
 
     trend = []
-    if "fecha_prometida" in df.columns:
-        df["fecha_prometida_dt"] = pd.to_datetime(df["fecha_prometida"], errors="coerce")
-        dft = df[pd.notnull(df["fecha_prometida_dt"])].copy()
-        if not dft.empty:
-            g = dft.groupby(pd.Grouper(key="fecha_prometida_dt", freq="W-MON")).agg(
-                solicitudes=("fecha_prometida_dt", "size")
-            ).reset_index()
-            g = g.rename(columns={"fecha_prometida_dt": "SEMANA"})
-            trend = g.to_dict("records")
+    dft = pd.DataFrame({"fecha_prometida_dt": items.fechas_dt("fecha_prometida")}).dropna()
+    if not dft.empty:
+        g = dft.groupby(pd.Grouper(key="fecha_prometida_dt", freq="W-MON")).agg(
+            solicitudes=("fecha_prometida_dt", "size")
+        ).reset_index()
+        trend = [
+            {"SEMANA": a_dias_epoca(semana), "solicitudes": int(n)}
+            for semana, n in zip(g["fecha_prometida_dt"], g["solicitudes"])
+        ]
 
     return conteo_general, trend
 
@@ -287,11 +349,10 @@ def procesar_resumen(df: pd.DataFrame) -> dict:
                     "Título": row.get("TITULO DE LA REQUISICION", "Sin título"),
                     "Estatus S.C.": map_estatus_sc(row.get("ESTATUS S.C.", "")),
                     "Estatus O.C.": map_estatus_oc(row.get("ESTATUS O.C.", "")),
-                    "Fecha prometida": fecha_prom.strftime("%d/%m/%Y") if pd.notnull(fecha_prom) else "-"
+                    "Fecha prometida": dia_json(a_dias_epoca(fecha_prom))
                 })
 
-    # Items persistidos
-    items = []
+    # Items persistidos (columnas compactas)
     cols = {
         "NO. S.C.": "no_sc",
         "TITULO DE LA REQUISICION": "titulo",
@@ -302,19 +363,27 @@ def procesar_resumen(df: pd.DataFrame) -> dict:
         "FECHA PROMETIDA": "fecha_prometida",
         "FECHA DE LLEGADA": "fecha_llegada",
     }
-    for _, row in df2.iterrows():
-        it = {}
-        for k, outk in cols.items():
-            it[outk] = row.get(k, "")
-        it["estatus_sc"] = map_estatus_sc(it.get("estatus_sc_raw", ""))
-        it["estatus_oc"] = map_estatus_oc(it.get("estatus_oc_raw", ""))
-        items.append(it)
+    n = len(df2)
+    columnas = {}
+    for k, outk in cols.items():
+        if k not in df2.columns:
+            columnas[outk] = [""] * n
+        elif outk.startswith("fecha_"):
+            # Sin forzar ns: pandas lee en us y un 9999-12-31 del ERP desborda ns
+            columnas[outk] = df2[k].to_numpy()
+        else:
+            columnas[outk] = df2[k].tolist()
+    columnas["estatus_sc"] = [map_estatus_sc(v) for v in columnas["estatus_sc_raw"]]
+    columnas["estatus_oc"] = [map_estatus_oc(v) for v in columnas["estatus_oc_raw"]]
+    items = ItemsCompactos.desde_columnas(columnas, n)
 
     items = dedup_items_por_clave(items, keys=["no_sc", "descripcion", "no_oc"])
     items = filtrar_items_servicios(items)  # seguridad extra
 
-    sin_oc_real = int(pd.Series([x.get("no_oc", None) for x in items]).apply(is_empty_oc).sum()) if items else 0
+    sin_oc_real = contar_sin_oc(items)
     conteo_general, trend = construir_conteo_general_y_trend_desde_items(items)
+    tendencias = construir_tendencias(items, clases_generales(items))
+    retrasos = analizar_retrasos(items)
 
     return {
         "total_registros": int(len(items)),  # ojo: ya sin servicios
@@ -325,7 +394,9 @@ def procesar_resumen(df: pd.DataFrame) -> dict:
         "items": items,
         "sin_oc_real": sin_oc_real,
         "conteo_general": {k: safe_int(v) for k, v in conteo_general.items()},
-        "trend": trend
+        "trend": trend,
+        "tendencias": tendencias,
+        "retrasos": retrasos,
     }
 
 # =========================
@@ -356,14 +427,19 @@ def kpi_card(label, value, hint="", tone="accent"):
 # =========================
 # GRÁFICAS
 # =========================
-def donut_general(conteo_general: dict, titulo="Estado actual"):
-    order = ["COMPLETADO", "PENDIENTE A LLEGAR", "SIN OC", "CANCELADO"]
-    colors = {
-        "COMPLETADO": "#22C55E",
-        "PENDIENTE A LLEGAR": "#60A5FA",
-        "SIN OC": "#FB923C",
-        "CANCELADO": "#EF4444"
-    }
+COLORES_CLASE = {
+    "COMPLETADO": "#22C55E",
+    "PENDIENTE A LLEGAR": "#60A5FA",
+    "SIN OC": "#FB923C",
+    "CANCELADO": "#EF4444"
+}
+
+# Las figuras se arman una vez por combinación de datos y opciones y se
+# comparten entre reruns y sesiones (cache_resource: no se modifican).
+@st.cache_resource(show_spinner=False, max_entries=512)
+def figura_donut(conteo_general: dict, titulo: str) -> go.Figure:
+    order = CLASES_GENERALES
+    colors = COLORES_CLASE
     labels = order
     values = [int(conteo_general.get(k, 0)) for k in order]
 
@@ -396,10 +472,36 @@ def donut_general(conteo_general: dict, titulo="Estado actual"):
             borderwidth=1
         )
     )
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    return fig
 
-def tendencia_semanal(trend_records, titulo="Tendencia semanal de solicitudes"):
-    if not trend_records:
+def donut_general(conteo_general: dict, titulo="Estado actual"):
+    st.plotly_chart(figura_donut(conteo_general, titulo), width="stretch", config={"displayModeBar": False})
+
+ETIQUETAS_GRANULARIDAD = {"dia": "Día", "semana": "Semana", "mes": "Mes"}
+ETIQUETAS_SERIE = {"prometida": "Fecha prometida", "llegada": "Fecha de llegada"}
+
+@st.fragment
+def tendencia_semanal(tendencias: dict, titulo="Tendencia de solicitudes"):
+    # Solo lee los conteos precalculados al cargar (ver tendencias.py).
+    # Fragmento: cambiar agrupación/fecha/apilado redibuja solo esta gráfica.
+    c1, c2, c3 = st.columns([3, 3, 2])
+    with c1:
+        gran = st.radio("Agrupar por", GRANULARIDADES, index=1, format_func=ETIQUETAS_GRANULARIDAD.get,
+                        horizontal=True, key="tend_granularidad")
+    with c2:
+        serie = st.radio("Fecha", list(SERIES_FECHA), format_func=ETIQUETAS_SERIE.get,
+                         horizontal=True, key="tend_serie")
+    with c3:
+        apilado = st.toggle("Por estado", value=False, key="tend_apilado")
+
+    datos = (tendencias or {}).get(gran, {}).get(serie, {})
+    fig = figura_tendencia(datos, gran, apilado, titulo)
+    st.plotly_chart(fig, width="stretch", config={"displayModeBar": False})
+
+@st.cache_resource(show_spinner=False, max_entries=512)
+def figura_tendencia(datos: dict, gran: str, apilado: bool, titulo: str) -> go.Figure:
+    inicio = datos.get("inicio", [])
+    if not inicio:
         fig = go.Figure()
         fig.update_layout(
             title=dict(text=titulo, font=dict(color="#0F172A", size=18)),
@@ -409,24 +511,38 @@ def tendencia_semanal(trend_records, titulo="Tendencia semanal de solicitudes"):
             margin=dict(l=10, r=10, t=55, b=10),
             annotations=[dict(text="Sin fechas para graficar", x=0.5, y=0.5, showarrow=False)]
         )
-        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
-        return
+        return fig
 
-    df_tr = pd.DataFrame(trend_records).copy()
-    df_tr["SEMANA"] = pd.to_datetime(df_tr["SEMANA"], errors="coerce")
-    df_tr["solicitudes"] = pd.to_numeric(df_tr["solicitudes"], errors="coerce").fillna(0).astype(int)
-    df_tr = df_tr.sort_values("SEMANA")
+    x = fechas_desde_dias(inicio)
+    conteos = datos.get("conteos", {})
+    etiqueta = ETIQUETAS_GRANULARIDAD[gran]
+    formato = "%m/%Y" if gran == "mes" else "%d/%m/%Y"
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df_tr["SEMANA"],
-        y=df_tr["solicitudes"],
-        mode="lines+markers",
-        name="Solicitudes",
-        line=dict(color="#0EA5E9", width=3.5),
-        marker=dict(size=8, color="#0EA5E9"),
-        hovertemplate="Semana: %{x|%d/%m/%Y}<br>Solicitudes: %{y}<extra></extra>"
-    ))
+    if apilado:
+        for clase in CLASES_GENERALES:
+            fig.add_trace(go.Bar(
+                x=x,
+                y=conteos.get(clase, [0] * len(inicio)),
+                name=clase,
+                marker=dict(color=COLORES_CLASE[clase]),
+                hovertemplate=f"{etiqueta}: %{{x|{formato}}}<br>{clase}: %{{y}}<extra></extra>"
+            ))
+        fig.update_layout(barmode="stack")
+    else:
+        # Periodos sin items en 0: la línea no cruza los huecos
+        denso = con_ceros(datos, gran)
+        n = len(denso["inicio"])
+        total = [sum(v) for v in zip(*(denso["conteos"].get(c, [0] * n) for c in CLASES_GENERALES))]
+        fig.add_trace(go.Scatter(
+            x=fechas_desde_dias(denso["inicio"]),
+            y=total,
+            mode="lines+markers",
+            name="Solicitudes",
+            line=dict(color="#0EA5E9", width=3.5),
+            marker=dict(size=8, color="#0EA5E9"),
+            hovertemplate=f"{etiqueta}: %{{x|{formato}}}<br>Solicitudes: %{{y}}<extra></extra>"
+        ))
 
     fig.update_layout(
         title=dict(text=titulo, font=dict(color="#0F172A", size=18)),
@@ -437,11 +553,11 @@ def tendencia_semanal(trend_records, titulo="Tendencia semanal de solicitudes"):
         margin=dict(l=10, r=10, t=55, b=45),
         height=360,
         xaxis=dict(
-            title="Semana (lunes)",
+            title={"dia": "Día", "semana": "Semana (lunes)", "mes": "Mes"}[gran],
             showgrid=True,
             gridcolor="rgba(15,23,42,.08)",
             linecolor="rgba(15,23,42,.25)",
-            tickformat="%d/%m\n%Y",
+            tickformat="%m/%Y" if gran == "mes" else "%d/%m\n%Y",
             tickfont=dict(color="#0F172A", size=11),
             ticks="outside"
         ),
@@ -456,7 +572,32 @@ def tendencia_semanal(trend_records, titulo="Tendencia semanal de solicitudes"):
         ),
         legend=dict(orientation="h", y=1.12, x=0.01, font=dict(color="#0F172A")),
     )
-    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    return fig
+
+@st.cache_resource(show_spinner=False, max_entries=512)
+def figura_histograma(hist: dict, titulo: str) -> go.Figure:
+    colores = ["#22C55E", "#22C55E", "#60A5FA", "#FB923C", "#F97316", "#EF4444"]
+    fig = go.Figure(data=[go.Bar(
+        x=hist.get("etiquetas", []),
+        y=hist.get("conteos", []),
+        marker=dict(color=colores, line=dict(color="rgba(15,23,42,.18)", width=1)),
+        hovertemplate="<b>%{x}</b><br>Partidas: %{y}<extra></extra>"
+    )])
+    fig.update_layout(
+        title=dict(text=titulo, font=dict(color="#0F172A", size=18)),
+        template="plotly_white",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(color="#0F172A"),
+        margin=dict(l=10, r=10, t=55, b=45),
+        height=360,
+        xaxis=dict(title="Llegada vs. fecha prometida", tickfont=dict(color="#0F172A", size=11)),
+        yaxis=dict(title="Partidas", gridcolor="rgba(15,23,42,.08)", rangemode="tozero"),
+    )
+    return fig
+
+def histograma_retrasos(hist: dict, titulo="Distribución de retrasos"):
+    st.plotly_chart(figura_histograma(hist, titulo), width="stretch", config={"displayModeBar": False})
 
 # =========================
 # CSS / TEMA
@@ -623,7 +764,7 @@ if st.session_state.modo is None:
 
         c1, c2 = st.columns(2)
         with c1:
-            if st.button("Invitado", type="secondary", use_container_width=True):
+            if st.button("Invitado", type="secondary", width="stretch"):
                 st.session_state.modo = "guest"
                 st.session_state.admin_ok = False
                 st.session_state.login_choice = None
@@ -631,14 +772,14 @@ if st.session_state.modo is None:
                 st.rerun()
 
         with c2:
-            if st.button("Administrador", type="primary", use_container_width=True):
+            if st.button("Administrador", type="primary", width="stretch"):
                 st.session_state.login_choice = "admin"
                 st.session_state.login_error = ""
 
         if st.session_state.login_choice == "admin":
             with st.form("admin_login_form", clear_on_submit=False):
                 pwd = st.text_input("Contraseña de administrador", type="password")
-                submit = st.form_submit_button("Acceder", type="primary", use_container_width=True)
+                submit = st.form_submit_button("Acceder", type="primary", width="stretch")
 
             if submit:
                 if pwd == ADMIN_PASS:
@@ -673,7 +814,7 @@ with st.sidebar:
         st.info("Invitado: solo lectura.")
 
     st.divider()
-    if st.button("Cambiar modo / salir", use_container_width=True):
+    if st.button("Cambiar modo / salir", width="stretch"):
         st.session_state.modo = None
         st.session_state.admin_ok = False
         st.session_state.login_choice = None
@@ -683,7 +824,9 @@ with st.sidebar:
 # =========================
 # ADMIN: CARGA MULTIPLE + PDF
 # =========================
-if st.session_state.modo == "admin" and st.session_state.admin_ok:
+# Cada panel es un fragmento: usar sus controles solo lo vuelve a ejecutar a él.
+@st.fragment
+def panel_carga_proyectos():
     st.markdown('<div class="tng-card">', unsafe_allow_html=True)
     st.subheader("Cargar proyectos (múltiples)")
     st.caption("Selecciona varios archivos .xlsx para actualizar proyectos (se reemplaza por nombre de proyecto).")
@@ -717,10 +860,10 @@ if st.session_state.modo == "admin" and st.session_state.admin_ok:
                         "resumen": resumen
                     }
 
-                    if do_replace:
-                        st.session_state.proyectos = upsert_proyecto(st.session_state.proyectos, nuevo)
-                    else:
-                        st.session_state.proyectos.append(nuevo)
+                    if nombre in st.session_state.proyectos and not do_replace:
+                        st.info(f"'{nombre}' ya existe: se conserva la versión guardada.")
+                        continue
+                    st.session_state.proyectos.upsert(nuevo)
                     ok += 1
                 except Exception as e:
                     errores += 1
@@ -731,13 +874,16 @@ if st.session_state.modo == "admin" and st.session_state.admin_ok:
                     items = p.get("resumen", {}).get("items", [])
                     p["resumen"]["items"] = dedup_items_por_clave(items, keys=["no_sc", "descripcion", "no_oc"])
 
+            indice_busqueda(st.session_state.proyectos).sincronizar(st.session_state.proyectos)
             guardar_datos(st.session_state.proyectos)
             st.success(f"Procesados: {ok}. Errores: {errores}.")
-            st.rerun()
+            st.rerun()  # toda la app: cambiaron los proyectos
 
     st.markdown("</div>", unsafe_allow_html=True)
     st.write("")
 
+@st.fragment
+def panel_subir_pdf():
     st.markdown('<div class="tng-card">', unsafe_allow_html=True)
     st.subheader("📄 Subir PDF")
     st.caption("Sube un PDF para que esté disponible para todos (admin + invitados).")
@@ -745,14 +891,23 @@ if st.session_state.modo == "admin" and st.session_state.admin_ok:
     pdf_file = st.file_uploader("Subir PDF", type=["pdf"], key="pdf_uploader")
     if pdf_file:
         safe_name = pdf_file.name.replace(" ", "_")
-        path = os.path.join(PDF_DIR, safe_name)
-        with open(path, "wb") as out:
-            out.write(pdf_file.getbuffer())
+        # El uploader conserva el archivo: se guarda una sola vez y se
+        # reejecuta la app para que aparezca en la lista de descargas
+        if st.session_state.get("pdf_guardado") != (safe_name, pdf_file.size):
+            path = os.path.join(PDF_DIR, safe_name)
+            with open(path, "wb") as out:
+                out.write(pdf_file.getbuffer())
+            st.session_state.pdf_guardado = (safe_name, pdf_file.size)
+            st.rerun()
         st.success(f"PDF guardado: {safe_name}")
 
     st.markdown("</div>", unsafe_allow_html=True)
     st.write("")
 
+if st.session_state.modo == "admin" and st.session_state.admin_ok:
+    panel_carga_proyectos()
+    panel_subir_pdf()
+
 # =========================
 # DASHBOARD
 # =========================
@@ -760,100 +915,76 @@ if not st.session_state.proyectos:
     st.info("No hay proyectos cargados todavía.")
     st.stop()
 
-nombres = sorted([p["nombre"] for p in st.session_state.proyectos])
-seleccion = st.selectbox("Selecciona un proyecto", nombres, key="select_proyecto")
-
-proyecto = next((p for p in st.session_state.proyectos if p["nombre"] == seleccion), None)
-if not proyecto:
-    st.warning("Proyecto no encontrado.")
-    st.stop()
-
-r = proyecto["resumen"]
-
-# Limpieza por si BD vieja trae SERVICIO/SERVICIOS
-r["items"] = filtrar_items_servicios(r.get("items", []))
-
-# Recalcular si faltan campos (BD vieja) usando items ya limpios
-items_bd = r.get("items", [])
-if ("conteo_general" not in r) or (not isinstance(r.get("conteo_general", None), dict)) or ("trend" not in r):
-    conteo_general_tmp, trend_tmp = construir_conteo_general_y_trend_desde_items(items_bd)
-    r["conteo_general"] = conteo_general_tmp
-    r["trend"] = trend_tmp
-if "sin_oc_real" not in r:
-    r["sin_oc_real"] = int(pd.Series([x.get("no_oc", None) for x in items_bd]).apply(is_empty_oc).sum()) if items_bd else 0
-
-st.markdown('<div class="tng-card">', unsafe_allow_html=True)
-st.subheader(f"Proyecto: {proyecto['nombre']}")
-st.markdown(
-    f"<div style='font-size:.9rem;'>Última carga: {proyecto.get('fecha_carga','-')} | Archivo: {proyecto.get('archivo','-')}</div>",
-    unsafe_allow_html=True
-)
-st.markdown("</div>", unsafe_allow_html=True)
-st.write("")
-
-# KPIs
-k1, k2, k3, k4 = st.columns(4)
-total_partidas = r.get("total_registros", 0)
-conteo_general = r.get("conteo_general", {}) or {}
-completados = int(conteo_general.get("COMPLETADO", 0))
-sin_oc_real = int(r.get("sin_oc_real", 0))
-avance_pct = (completados * 100.0 / total_partidas) if total_partidas else 0.0
-
-with k1:
-    kpi_card("Items Solicitados", f"{total_partidas:,}", "Total de partidas", tone="accent")
-with k2:
-    kpi_card("Completados", f"{completados:,}", "General (OC/SC)", tone="ok")
-with k3:
-    kpi_card("Items sin OC", f"{sin_oc_real:,}", "No. O.C. vacío/NaN", tone="warn")
-with k4:
-    kpi_card("Avance", f"{avance_pct:.1f}%", "Completados / total", tone="ok" if avance_pct >= 75 else "warn")
-
-st.write("")
+# =========================
+# BÚSQUEDA EN TODOS LOS PROYECTOS
+# =========================
+def resultados_busqueda(partidas: list) -> pd.DataFrame:
+    nombres_pid = {(p.get("id") or p.get("nombre")): p.get("nombre") for p in st.session_state.proyectos}
+    filas = []
+    for pid, sub in partidas:
+        for it, clase in zip(sub, clases_generales(sub)):
+            filas.append({
+                "Proyecto": nombres_pid.get(pid, pid),
+                "No. S.C.": it["no_sc"],
+                "Título": it["titulo"],
+                "Descripción": it["descripcion"],
+                "No. O.C.": it["no_oc"],
+                "Estado": clase,
+            })
+    return pd.DataFrame(filas)
+
+@st.fragment
+def seccion_busqueda():
+    consulta = st.text_input(
+        "🔎 Buscar en todos los proyectos",
+        placeholder="No. de parte, descripción, No. S.C. o No. O.C.",
+        key="busqueda_global",
+    )
+    if consulta.strip():
+        indice = indice_busqueda(st.session_state.proyectos)
+        t0 = time.perf_counter()
+        partidas = indice.buscar_partidas(consulta, limite=200)
+        ms = (time.perf_counter() - t0) * 1000
+        n = sum(len(sub) for _, sub in partidas)
+        if n:
+            st.caption(f"{n} coincidencias{' (máximo 200)' if n >= 200 else ''} en {ms:.1f} ms")
+            st.dataframe(style_light_table(resultados_busqueda(partidas)), width="stretch", hide_index=True)
+        else:
+            st.info("Sin coincidencias.")
+        st.write("")
 
-# Gráficas
-g1, g2 = st.columns([2, 1])
-with g1:
-    st.markdown('<div class="tng-card">', unsafe_allow_html=True)
-    tendencia_semanal(r.get("trend", []), "Tendencia semanal de solicitudes")
-    st.markdown('</div>', unsafe_allow_html=True)
-
-with g2:
-    st.markdown('<div class="tng-card">', unsafe_allow_html=True)
-    donut_general(conteo_general, "Estado actual")
-    st.markdown('</div>', unsafe_allow_html=True)
+seccion_busqueda()
 
 # =========================
 # TABLA CRÍTICOS (SIN FILTROS) - ESTILO CLARO
 # =========================
-st.write("")
-st.subheader("📋 Gestión de Pedidos (Items Críticos)")
-
-crit = r.get("criticos", [])
-if crit:
-    dfc = pd.DataFrame(crit).copy()
-
-    if "Prometida" in dfc.columns and "Fecha prometida" not in dfc.columns:
-        dfc = dfc.rename(columns={"Prometida": "Fecha prometida"})
+def calc_avance(dias, est_sc, est_oc):
+    est_sc = str(est_sc).strip().upper()
+    est_oc = str(est_oc).strip().upper()
 
-    dfc["Fecha_prometida_dt"] = pd.to_datetime(dfc.get("Fecha prometida", None), format="%d/%m/%Y", errors="coerce")
-    dfc["Dias"] = dfc["Fecha_prometida_dt"].apply(dias_restantes)
-
-    def calc_avance(dias, est_sc, est_oc):
-        est_sc = str(est_sc).strip().upper()
-        est_oc = str(est_oc).strip().upper()
-
-        if est_sc == "COMPLETADO" and est_oc == "COMPLETADO":
-            return 100, "Completado"
-        if est_sc == "CANCELADO" or est_oc == "CANCELADO":
-            return 0, "Cancelado"
-        if dias is None:
-            return 5, "Sin fecha"
-        if dias < 0:
-            return 0, f"Vencido {abs(dias)} días"
-
-        maxwin = 30
-        pct = int(max(0, min(100, (maxwin - min(dias, maxwin)) * 100 / maxwin)))
-        return pct, f"{dias} días restantes"
+    if est_sc == "COMPLETADO" and est_oc == "COMPLETADO":
+        return 100, "Completado"
+    if est_sc == "CANCELADO" or est_oc == "CANCELADO":
+        return 0, "Cancelado"
+    if dias is None:
+        return 5, "Sin fecha"
+    if dias < 0:
+        return 0, f"Vencido {abs(dias)} días"
+
+    maxwin = 30
+    pct = int(max(0, min(100, (maxwin - min(dias, maxwin)) * 100 / maxwin)))
+    return pct, f"{dias} días restantes"
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def tabla_criticos(nombre: str, version: str, hoy: int, _crit: list) -> pd.DataFrame:
+    # Clave: proyecto + versión cargada (id, fecha_carga) + día, porque los
+    # días restantes cambian a diario. _crit no se hashea.
+    dfc = pd.DataFrame(_crit).copy()
+
+    # Fechas guardadas como días: sin parseo al mostrar
+    dias_prom = [c.get("Fecha prometida") for c in _crit]
+    dfc["Fecha prometida"] = fechas_desde_dias(dias_prom)
+    dfc["Dias"] = [dias_restantes(d) for d in dias_prom]
 
     dfc[["Avance %", "Detalle avance"]] = dfc.apply(
         lambda x: pd.Series(calc_avance(x.get("Dias"), x.get("Estatus S.C."), x.get("Estatus O.C."))),
@@ -861,48 +992,296 @@ if crit:
     )
 
     cols_show = ["No. S.C.", "Título", "Estatus S.C.", "Estatus O.C.", "Fecha prometida", "Avance %", "Detalle avance"]
-    dfc = dfc[cols_show].copy()
-
-    st.dataframe(
-        style_light_table(dfc),
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "Avance %": st.column_config.ProgressColumn("Avance", min_value=0, max_value=100, format="%d%%"),
-        },
-    )
-else:
-    st.success("✅ Sin materiales críticos con la lógica actual.")
+    return dfc[cols_show].copy()
 
 # =========================
-# TABLA COMPLETA (SIN FILTROS) - ESTILO CLARO
+# RETRASOS ENTRE PROYECTOS / TABLA COMPLETA
 # =========================
-with st.expander("Ver tabla completa del proyecto"):
-    items = filtrar_items_servicios(r.get("items", []))
-    if not items:
-        st.info("No hay items guardados en este proyecto.")
-    else:
-        dfi = pd.DataFrame(items).copy()
-
-        dfi["No. S.C."] = dfi.get("no_sc", "")
-        dfi["Título"] = dfi.get("titulo", "")
-        dfi["Descripción"] = dfi.get("descripcion", "")
-        dfi["No. O.C."] = dfi.get("no_oc", "")
-        dfi["Estatus S.C."] = dfi.get("estatus_sc", "")
-        dfi["Estatus O.C."] = dfi.get("estatus_oc", "")
-        dfi["Fecha prometida"] = pd.to_datetime(dfi.get("fecha_prometida", ""), errors="coerce")
-        dfi["Fecha llegada"] = pd.to_datetime(dfi.get("fecha_llegada", ""), errors="coerce")
+# Expanders con estado (on_change="rerun"): el cuerpo solo se ejecuta
+# abierto, y al abrirlo se reejecuta solo su fragmento.
+@st.fragment
+def comparar_retrasos():
+    with st.expander("Comparar retrasos entre proyectos", key="exp_comparar_retrasos", on_change="rerun") as exp:
+        if not exp.open:
+            return
+        filas = []
+        for p in st.session_state.proyectos:
+            rp = (p.get("resumen", {}).get("retrasos") or {}).get("proyecto", {})
+            if rp.get("n"):
+                filas.append({
+                    "Proyecto": p["nombre"],
+                    "Partidas medidas": rp["n"],
+                    "Retraso p50 (d)": rp["p50"],
+                    "Retraso p90 (d)": rp["p90"],
+                    "Promedio (d)": rp["promedio"],
+                    "A tiempo %": rp["a_tiempo_pct"],
+                })
+        if filas:
+            dfp = pd.DataFrame(filas).sort_values("Retraso p90 (d)", ascending=False)
+            st.dataframe(style_light_table(dfp), width="stretch", hide_index=True)
+        else:
+            st.info("Ningún proyecto tiene retrasos calculados todavía (se calculan al cargar el Excel).")
+
+@st.fragment
+def tabla_completa(r: dict):
+    with st.expander("Ver tabla completa del proyecto", key="exp_tabla_completa", on_change="rerun") as exp:
+        if not exp.open:
+            return
+        items = filtrar_items_servicios(r.get("items", []))
+        if not len(items):
+            st.info("No hay items guardados en este proyecto.")
+            return
+        # El DataFrame se arma solo aquí, al mostrar
+        dfi = items.a_dataframe().rename(columns={
+            "no_sc": "No. S.C.",
+            "titulo": "Título",
+            "descripcion": "Descripción",
+            "no_oc": "No. O.C.",
+            "estatus_sc": "Estatus S.C.",
+            "estatus_oc": "Estatus O.C.",
+            "fecha_prometida": "Fecha prometida",
+            "fecha_llegada": "Fecha llegada",
+        })
 
         show = dfi[[
             "No. S.C.", "Título", "Descripción", "No. O.C.",
             "Estatus S.C.", "Estatus O.C.", "Fecha prometida", "Fecha llegada"
         ]].copy()
 
-        st.dataframe(style_light_table(show), use_container_width=True, hide_index=True)
+        st.dataframe(style_light_table(show), width="stretch", hide_index=True)
+
+# =========================
+# EXPORTAR (CSV / XLSX)
+# =========================
+ETIQUETAS_EXPORT = {
+    "proyecto": "Proyecto seleccionado (todas las partidas)",
+    "criticos": "Items críticos del proyecto",
+    "todos": "Todos los proyectos",
+}
+MIME_EXPORT = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def generar_exportacion(proys: list, alcance: str, formato: str) -> BytesIO:
+    # data= del botón: corre al hacer clic; el archivo no se queda en la sesión
+    buf = BytesIO()
+    exportar(proys, "criticos" if alcance == "criticos" else "items", formato, buf)
+    buf.seek(0)
+    return buf
+
+@st.fragment
+def seccion_exportar(proyecto: dict):
+    st.write("")
+    st.subheader("📤 Exportar")
+
+    e1, e2 = st.columns([2, 1])
+    with e1:
+        alcance = st.selectbox("Qué exportar", list(ETIQUETAS_EXPORT), format_func=ETIQUETAS_EXPORT.get, key="export_alcance")
+    with e2:
+        formato = st.radio("Formato", ["xlsx", "csv"], horizontal=True, key="export_formato")
+
+    proys = st.session_state.proyectos if alcance == "todos" else [proyecto]
+    if alcance == "criticos":
+        n = len(proyecto.get("resumen", {}).get("criticos", []))
+    else:
+        n = sum(len(p.get("resumen", {}).get("items") or []) for p in proys)
+    base = "todos_los_proyectos" if alcance == "todos" else proyecto["nombre"].replace(" ", "_")
+    if alcance == "criticos":
+        base += "_criticos"
+    nombre_archivo = f"{base}_{dt.date.today():%Y%m%d}.{formato}"
+
+    st.download_button(
+        label=f"⬇️ Descargar {nombre_archivo} ({n:,} filas)",
+        data=partial(generar_exportacion, proys, alcance, formato),
+        file_name=nombre_archivo,
+        mime=MIME_EXPORT[formato],
+        on_click="ignore",
+        key="download_export"
+    )
+
+# =========================
+# VISTA DEL PROYECTO
+# =========================
+# Selector + todo lo que depende del proyecto elegido. Cambiar de proyecto
+# reejecuta solo este fragmento (no el CSS, el encabezado, la búsqueda ni
+# los paneles de admin); gráfica, tabla completa y exportación son
+# fragmentos anidados.
+POR_PAGINA = 50
+ETIQUETAS_ORDEN = {"recientes": "Recientes", "alfabetico": "A-Z"}
+
+@st.fragment
+def vista_proyecto():
+    # Se filtra y pagina en el índice: al navegador solo va la página actual
+    s1, s2 = st.columns([3, 1])
+    with s1:
+        filtro = st.text_input("Buscar proyecto", placeholder="Escribe parte del nombre...", key="filtro_proyecto")
+    with s2:
+        orden = st.radio("Orden", list(ETIQUETAS_ORDEN), format_func=ETIQUETAS_ORDEN.get, horizontal=True, key="orden_proyectos")
+
+    pagina = st.session_state.get("pagina_proyectos", 1)
+    nombres, total = st.session_state.proyectos.buscar(filtro, orden, (pagina - 1) * POR_PAGINA, POR_PAGINA)
+    paginas = max(1, -(-total // POR_PAGINA))
+    if pagina > paginas:
+        pagina = st.session_state.pagina_proyectos = 1
+        nombres, total = st.session_state.proyectos.buscar(filtro, orden, 0, POR_PAGINA)
+
+    if not nombres:
+        st.info("Ningún proyecto coincide con la búsqueda.")
+        return
+
+    s3, s4 = st.columns([3, 1])
+    with s3:
+        seleccion = st.selectbox("Selecciona un proyecto", nombres, key="select_proyecto")
+    with s4:
+        if paginas > 1:
+            st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key="pagina_proyectos")
+    inicio = (pagina - 1) * POR_PAGINA
+    st.caption(f"Mostrando {inicio + 1}-{inicio + len(nombres)} de {total} proyectos")
+
+    proyecto = st.session_state.proyectos.obtener(seleccion)
+    if not proyecto:
+        st.warning("Proyecto no encontrado.")
+        return
+
+    r = proyecto["resumen"]
+
+    # Limpieza por si BD vieja trae SERVICIO/SERVICIOS
+    r["items"] = filtrar_items_servicios(r.get("items", []))
+
+    # Recalcular si faltan campos (BD vieja) usando items ya limpios
+    items_bd = r.get("items", [])
+    if ("conteo_general" not in r) or (not isinstance(r.get("conteo_general", None), dict)) or ("trend" not in r):
+        conteo_general_tmp, trend_tmp = construir_conteo_general_y_trend_desde_items(items_bd)
+        r["conteo_general"] = conteo_general_tmp
+        r["trend"] = trend_tmp
+    if "sin_oc_real" not in r:
+        r["sin_oc_real"] = contar_sin_oc(items_bd)
+    if "tendencias" not in r:
+        r["tendencias"] = construir_tendencias(items_bd, clases_generales(items_bd))
+    if "retrasos" not in r:
+        r["retrasos"] = analizar_retrasos(items_bd)
+
+    st.markdown('<div class="tng-card">', unsafe_allow_html=True)
+    st.subheader(f"Proyecto: {proyecto['nombre']}")
+    st.markdown(
+        f"<div style='font-size:.9rem;'>Última carga: {proyecto.get('fecha_carga','-')} | Archivo: {proyecto.get('archivo','-')}</div>",
+        unsafe_allow_html=True
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+    st.write("")
+
+    # KPIs
+    k1, k2, k3, k4 = st.columns(4)
+    total_partidas = r.get("total_registros", 0)
+    conteo_general = r.get("conteo_general", {}) or {}
+    completados = int(conteo_general.get("COMPLETADO", 0))
+    sin_oc_real = int(r.get("sin_oc_real", 0))
+    avance_pct = (completados * 100.0 / total_partidas) if total_partidas else 0.0
+
+    with k1:
+        kpi_card("Items Solicitados", f"{total_partidas:,}", "Total de partidas", tone="accent")
+    with k2:
+        kpi_card("Completados", f"{completados:,}", "General (OC/SC)", tone="ok")
+    with k3:
+        kpi_card("Items sin OC", f"{sin_oc_real:,}", "No. O.C. vacío/NaN", tone="warn")
+    with k4:
+        kpi_card("Avance", f"{avance_pct:.1f}%", "Completados / total", tone="ok" if avance_pct >= 75 else "warn")
+
+    st.write("")
+
+    # Gráficas
+    g1, g2 = st.columns([2, 1])
+    with g1:
+        st.markdown('<div class="tng-card">', unsafe_allow_html=True)
+        tendencia_semanal(r.get("tendencias", {}), "Tendencia de solicitudes")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with g2:
+        st.markdown('<div class="tng-card">', unsafe_allow_html=True)
+        donut_general(conteo_general, "Estado actual")
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Items críticos
+    st.write("")
+    st.subheader("📋 Gestión de Pedidos (Items Críticos)")
+
+    crit = r.get("criticos", [])
+    if crit:
+        version = f"{proyecto.get('id', '')}|{proyecto.get('fecha_carga', '')}"
+        dfc = tabla_criticos(proyecto["nombre"], version, hoy_dias_epoca(), crit)
+        st.dataframe(
+            style_light_table(dfc),
+            width="stretch",
+            hide_index=True,
+            column_config={
+                "Avance %": st.column_config.ProgressColumn("Avance", min_value=0, max_value=100, format="%d%%"),
+                "Fecha prometida": st.column_config.DateColumn("Fecha prometida", format="DD/MM/YYYY"),
+            },
+        )
+    else:
+        st.success("✅ Sin materiales críticos con la lógica actual.")
+
+    # Retrasos de proveedores (precalculado al cargar)
+    st.write("")
+    st.subheader("⏱️ Retrasos de proveedores")
+
+    ret = r.get("retrasos", {}) or {}
+    ret_proy = ret.get("proyecto", {})
+    if not ret_proy.get("n"):
+        st.info("Sin partidas con fecha prometida y fecha de llegada para medir retrasos.")
+    else:
+        a_tiempo = ret_proy["a_tiempo_pct"]
+        k1, k2, k3, k4 = st.columns(4)
+        with k1:
+            kpi_card("Retraso mediano", f"{ret_proy['p50']:+.1f} d", "p50 llegada - prometida", tone="accent")
+        with k2:
+            kpi_card("Retraso p90", f"{ret_proy['p90']:+.1f} d", "9 de cada 10 llegan antes de esto", tone="warn" if ret_proy["p90"] > 0 else "ok")
+        with k3:
+            kpi_card("A tiempo", f"{a_tiempo:.1f}%", "Llegó en o antes de la fecha", tone="ok" if a_tiempo >= 75 else "warn")
+        with k4:
+            kpi_card("Partidas medidas", f"{ret_proy['n']:,}", "Con ambas fechas", tone="accent")
+
+        st.write("")
+        h1, h2 = st.columns([1, 2])
+        with h1:
+            st.markdown('<div class="tng-card">', unsafe_allow_html=True)
+            histograma_retrasos(ret_proy.get("histograma", {}))
+            st.markdown('</div>', unsafe_allow_html=True)
+        with h2:
+            por_oc = ret.get("por_oc", {})
+            dfo = pd.DataFrame(por_oc).rename(columns={
+                "no_oc": "No. O.C.",
+                "n": "Partidas",
+                "p50": "Retraso p50 (d)",
+                "p90": "Retraso p90 (d)",
+                "max": "Retraso máx. (d)",
+                "a_tiempo_pct": "A tiempo %",
+            })
+            st.caption(f"Órdenes de compra con más retraso (p90) — {len(dfo):,} OC con llegada registrada")
+            st.dataframe(
+                style_light_table(dfo.head(50)),
+                width="stretch",
+                hide_index=True,
+                height=330,
+                column_config={
+                    "A tiempo %": st.column_config.ProgressColumn("A tiempo", min_value=0, max_value=100, format="%.0f%%"),
+                },
+            )
+
+    comparar_retrasos()
+    tabla_completa(r)
+    seccion_exportar(proyecto)
+
+vista_proyecto()
 
 # =========================
 # DESCARGA DE NOTAS (PDF) - TODOS
 # =========================
+def leer_pdf(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
 st.write("")
 st.subheader("📥 LISTAS DE PEDIDO")
 
@@ -911,14 +1290,13 @@ if pdfs:
     st.markdown('<div class="tng-card">', unsafe_allow_html=True)
     st.caption("Haz clic en el botón para descargar las notas del proyecto.")
     for pdf_name in pdfs:
-        path = os.path.join(PDF_DIR, pdf_name)
-        with open(path, "rb") as f:
-            pdf_bytes = f.read()
+        # Se lee del disco solo al hacer clic, y descargar no reejecuta la app
         st.download_button(
             label=f"📄 Descargar {pdf_name}",
-            data=pdf_bytes,
+            data=partial(leer_pdf, os.path.join(PDF_DIR, pdf_name)),
             file_name=pdf_name,
             mime="application/pdf",
+            on_click="ignore",
             key=f"download_{pdf_name}"
         )
     st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,132 @@
+"""Prueba de carga de api_kpis.py: peticiones/s con y sin ETag (200 vs 304).
+
+Uso: python benchmarks/carga_api.py [--proyectos 200] [--items 500] [--clientes 8] [--segundos 5]
+     python benchmarks/carga_api.py --url http://127.0.0.1:8502   (servidor ya corriendo)
+
+Sin --url arma una BD sintética en un directorio temporal y levanta la API
+como proceso aparte.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlparse
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+from sintetico import proyectos, guardar_bd
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar(host, puerto, timeout=30):
+    fin = time.time() + timeout
+    while time.time() < fin:
+        try:
+            c = http.client.HTTPConnection(host, puerto, timeout=1)
+            c.request("GET", "/api/proyectos")
+            c.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("La API no respondió a tiempo")
+
+
+def correr(host, puerto, urls, etags, clientes, segundos, con_etag):
+    latencias, codigos = [], {}
+    lock = threading.Lock()
+    fin = time.time() + segundos
+
+    def cliente(seed):
+        rnd = random.Random(seed)
+        conn = http.client.HTTPConnection(host, puerto, timeout=10)
+        lat, cods = [], {}
+        while time.time() < fin:
+            url = rnd.choice(urls)
+            headers = {"If-None-Match": etags[url]} if con_etag else {}
+            t0 = time.perf_counter()
+            conn.request("GET", url, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            lat.append(time.perf_counter() - t0)
+            cods[resp.status] = cods.get(resp.status, 0) + 1
+        with lock:
+            latencias.extend(lat)
+            for k, v in cods.items():
+                codigos[k] = codigos.get(k, 0) + v
+
+    hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(clientes)]
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - t0
+
+    latencias.sort()
+    p = lambda q: latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000
+    etiqueta = "If-None-Match (304)" if con_etag else "sin ETag (200)"
+    print(f"{etiqueta:<20} {len(latencias) / total:>9,.0f} req/s  p50 {p(.50):6.2f} ms  "
+          f"p95 {p(.95):6.2f} ms  p99 {p(.99):6.2f} ms  códigos {codigos}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url")
+    ap.add_argument("--proyectos", type=int, default=200)
+    ap.add_argument("--items", type=int, default=500)
+    ap.add_argument("--clientes", type=int, default=8)
+    ap.add_argument("--segundos", type=float, default=5)
+    args = ap.parse_args()
+
+    proc = None
+    tmp = tempfile.TemporaryDirectory()
+    try:
+        if args.url:
+            u = urlparse(args.url)
+            host, puerto = u.hostname, u.port or 80
+        else:
+            db = os.path.join(tmp.name, "db_proyectos.json")
+            guardar_bd(proyectos(args.proyectos, args.items), db)
+            host, puerto = "127.0.0.1", puerto_libre()
+            proc = subprocess.Popen(
+                [sys.executable, os.path.join(RAIZ, "api_kpis.py"), "--db", db, "--puerto", str(puerto)],
+                stdout=subprocess.DEVNULL,
+            )
+        esperar(host, puerto)
+
+        conn = http.client.HTTPConnection(host, puerto)
+        conn.request("GET", "/api/proyectos")
+        lista = json.loads(conn.getresponse().read())
+        urls = [u for p in lista for u in p["urls"].values()]
+        etags = {}
+        for url in urls:
+            conn.request("GET", url)
+            resp = conn.getresponse()
+            resp.read()
+            etags[url] = resp.getheader("ETag")
+
+        print(f"{len(lista)} proyectos, {len(urls)} URLs, {args.clientes} clientes, {args.segundos:g} s por fase")
+        correr(host, puerto, urls, etags, args.clientes, args.segundos, con_etag=False)
+        correr(host, puerto, urls, etags, args.clientes, args.segundos, con_etag=True)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
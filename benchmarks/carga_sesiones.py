@@ -0,0 +1,170 @@
+"""Carga de sesiones concurrentes sobre app.py: latencia de rerun y RSS del proceso.
+
+Uso: python benchmarks/carga_sesiones.py [--sesiones 1,2,4,8,16] [--rondas 5]
+                                          [--proyectos 50] [--items 2000] [--pdfs 5] [--pdf-mb 1]
+
+Cada sesión es un AppTest de Streamlit que ejecuta el app.py real, en un
+hilo propio dentro de este proceso (como las sesiones de un servidor
+`streamlit run`). Recorrido por sesión:
+  1. abrir la página (cargar_datos) y entrar como invitado
+  2. por ronda:
+     - "proyecto":       elegir un proyecto al azar
+     - "tabla_completa": abrir el expander de la tabla completa (rerun)
+     - "descarga_pdf":   clic en un PDF; on_click="ignore" no reejecuta,
+                         se mide generar el archivo con su callable
+                         (data=) por el MediaFileManager, como el servidor
+AppTest reejecuta siempre el script completo; el costo por fragmento de
+cada interacción está en reruns.py. Para parecerse al servidor, main()
+parchea internos de Streamlit (simular_servidor): todas las sesiones
+comparten un Runtime y un ScriptCache, y los botones de descarga usan un
+MediaFileManager en memoria. Un run que no deja elementos se cuenta como
+error con su tiempo.
+
+Todo corre en un directorio temporal con una BD y PDFs sintéticos.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test, local_script_runner
+from streamlit.elements.widgets import button as st_button
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+from medicion import rss_bytes, PicoRSS
+from sintetico import preparar
+
+APP = os.path.join(RAIZ, "app.py")
+PASOS = ["abrir", "invitado", "proyecto", "tabla_completa", "descarga_pdf"]
+
+def simular_servidor() -> MediaFileManager:
+    # Solo al correr este script (main): parchea internos de Streamlit.
+    # Un solo Runtime por proceso: AppTest pone Runtime._instance al empezar
+    # cada run y lo deja en None al terminar; con sesiones en hilos, el hilo
+    # del script de otra sesión lo encontraba en None y moría antes de
+    # ejecutar app.py (run sin elementos)
+    servidor = MagicMock(spec=Runtime)
+    servidor.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    servidor.dataframe_source_mgr = DataframeSourceManager()
+    servidor.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: servidor)
+    Runtime.exists = classmethod(lambda cls: True)
+    # Un solo bytecode de app.py para todas las sesiones, como en `streamlit run`
+    # (compilar en varios hilos a la vez falla en CPython 3.11)
+    cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: cache
+    # Descargas diferidas (data=callable) como en `streamlit run`, aparte
+    # del Runtime: todas las sesiones de AppTest tienen el mismo session_id y
+    # la limpieza de fin de run borraría los callables de las demás
+    media = MediaFileManager(MemoryMediaFileStorage("/media"))
+    st_button.runtime = SimpleNamespace(exists=lambda: True, get_instance=lambda: SimpleNamespace(media_file_mgr=media))
+    return media
+
+
+def descargar(media: MediaFileManager, boton) -> int:
+    # Lo que hace el servidor al pedir el archivo: ejecutar el callable y guardarlo
+    url = media.execute_deferred(boton.proto.deferred_file_id)
+    fid = url.rsplit("/", 1)[-1].split(".")[0]
+    tam = len(media._storage.get_file(fid).content)
+    with media._lock:  # ya se "envió": no acumular los PDFs en memoria
+        media._delete_file(fid)
+    return tam
+
+
+def sesion(seed, nombres, rondas, media, latencias, errores):
+    rnd = random.Random(seed)
+    lat = {}
+
+    def medir(paso, fn):
+        t0 = time.perf_counter()
+        at = fn()
+        lat.setdefault(paso, []).append(time.perf_counter() - t0)
+        if isinstance(at, AppTest):
+            if at.exception:
+                errores.append(f"{paso}: {at.exception[0].message}")
+            if not at.main.children:
+                errores.append(f"{paso}: rerun sin elementos")
+        return at
+
+    try:
+        at = medir("abrir", lambda: AppTest.from_file(APP, default_timeout=600).run())
+        at = medir("invitado", lambda: at.button[0].click().run())
+        for _ in range(rondas):
+            nombre = rnd.choice(nombres)
+            at.text_input(key="filtro_proyecto").set_value(nombre)
+            at = medir("proyecto", lambda: at.run())
+            at.session_state["exp_tabla_completa"] = True
+            at = medir("tabla_completa", lambda: at.run())
+            at.session_state["exp_tabla_completa"] = False
+            pdf = rnd.choice([b for b in at.download_button if b.label.startswith("📄")])
+            if medir("descarga_pdf", lambda: descargar(media, pdf)) <= 0:
+                errores.append(f"descarga_pdf: {pdf.label} vacío")
+    except Exception as e:  # una sesión caída no debe tumbar la medición
+        errores.append(repr(e))
+    for paso, v in lat.items():
+        latencias.setdefault(paso, []).extend(v)
+
+
+def percentil(v, q):
+    v = sorted(v)
+    return v[min(len(v) - 1, int(q * len(v)))] * 1000 if v else float("nan")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sesiones", default="1,2,4,8,16")
+    ap.add_argument("--rondas", type=int, default=5)
+    ap.add_argument("--proyectos", type=int, default=50)
+    ap.add_argument("--items", type=int, default=2000)
+    ap.add_argument("--pdfs", type=int, default=5)
+    ap.add_argument("--pdf-mb", type=float, default=1.0)
+    args = ap.parse_args()
+
+    media = simular_servidor()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        nombres = preparar(tmp, args.proyectos, args.items, args.pdfs, args.pdf_mb)
+        os.chdir(tmp)  # app.py usa rutas relativas (BD y pdf_notas)
+        try:
+            print(f"BD: {args.proyectos} proyectos x {args.items:,} items, {args.pdfs} PDFs de {args.pdf_mb:g} MB")
+            print(f"{'sesiones':>8} {'paso':<15} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                  f"{'RSS pico MiB':>13} {'RSS fin MiB':>12} errores")
+            for n in [int(x) for x in args.sesiones.split(",")]:
+                latencias, errores = {}, []
+                with PicoRSS() as mem:
+                    hilos = [
+                        threading.Thread(target=sesion, args=(i, nombres, args.rondas, media, latencias, errores))
+                        for i in range(n)
+                    ]
+                    for h in hilos:
+                        h.start()
+                    for h in hilos:
+                        h.join()
+                    rss_fin = rss_bytes()
+                for paso in PASOS:
+                    v = latencias.get(paso, [])
+                    print(f"{n:>8} {paso:<15} {percentil(v, .5):9.0f} {percentil(v, .95):9.0f} "
+                          f"{percentil(v, .99):9.0f} {mem.pico / 2**20:13.0f} {rss_fin / 2**20:12.0f} {len(errores)}")
+                for e in errores[:3]:
+                    print("   error:", e)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Tiempo y memoria pico de la exportación en streaming (CSV / XLSX).
+
+Uso: python benchmarks/exportacion.py [n_proyectos] [items_por_proyecto] [--comparar]
+
+Por defecto 50 proyectos x 10,000 items = 500k filas. La memoria es el
+incremento del RSS pico sobre el RSS con los proyectos ya cargados.
+--comparar agrega la ruta ingenua (DataFrame + Styler) como referencia.
+"""
+import os
+import sys
+import gc
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+
+from exportar import exportar, filas_items, ENCABEZADO_ITEMS
+from medicion import PicoRSS
+from sintetico import proyectos
+
+
+def medir(nombre, fn):
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "salida")
+        gc.collect()
+        with PicoRSS() as mem:
+            t0 = time.perf_counter()
+            n = fn(ruta)
+            seg = time.perf_counter() - t0
+        tam = os.path.getsize(ruta)
+    print(f"{nombre:<22} {n:>9,} filas  {seg:7.2f} s  {n / seg:>10,.0f} filas/s  "
+          f"pico +{mem.incremento / 2**20:7.1f} MiB  archivo {tam / 2**20:6.1f} MiB")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    n_proy = int(args[0]) if args else 50
+    por_proy = int(args[1]) if len(args) > 1 else 10_000
+    proys = proyectos(n_proy, por_proy)
+    print(f"{n_proy} proyectos x {por_proy:,} items")
+
+    def streaming(formato):
+        def fn(ruta):
+            with open(ruta, "wb") as f:
+                return exportar(proys, "items", formato, f)
+        return fn
+
+    medir("streaming csv", streaming("csv"))
+    medir("streaming xlsx", streaming("xlsx"))
+
+    if "--comparar" in sys.argv:
+        def dataframe(formato):
+            def fn(ruta):
+                df = pd.DataFrame(list(filas_items(proys)), columns=ENCABEZADO_ITEMS)
+                if formato == "xlsx":
+                    df.style.to_excel(ruta, index=False, engine="openpyxl")
+                else:
+                    df.to_csv(ruta, index=False)
+                return len(df)
+            return fn
+
+        medir("DataFrame csv", dataframe("csv"))
+        medir("DataFrame+Styler xlsx", dataframe("xlsx"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Lectura del Excel del ERP: escaneo del encabezado vs. diseño registrado.
+
+Uso: python benchmarks/lectura_excel.py [n_filas] [columnas_extra]
+
+Por defecto 20,000 partidas con 30 columnas que el dashboard no usa.
+"escaneo" es el camino de siempre (nombre con el libro completo, búsqueda
+de "No. S.C." fila por fila y segunda lectura con header=); "diseño
+conocido" es RegistroDisenos.leer con el diseño ya aprendido. Ambos
+DataFrames se comparan en las columnas que usa procesar_resumen.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import datetime as dt
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+from openpyxl import Workbook
+
+from disenos_excel import RegistroDisenos, limpiar_columna, columna_descripcion, COL_DESCRIPCION
+from sintetico import items_dicts
+
+ENCABEZADO = [
+    "No. S.C.", "TITULO DE LA\nREQUISICION", "DESCRIPCION DE LA PARTIDA", "ESTATUS S.C.",
+    "ESTATUS O.C.", "No. O.C.", "FECHA PROMETIDA", "FECHA DE LLEGADA", "CANT DISPONIBLE",
+]
+
+
+def libro(n: int, extra: int) -> bytes:
+    # Mismo acomodo que el reporte del ERP: nombre en C4, encabezado en la fila 7
+    rnd = random.Random(3)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte")
+    ws.append(["REPORTE DE SEGUIMIENTO DE MATERIALES", None, None, None, dt.datetime(2025, 1, 1)])
+    ws.append([])
+    ws.append([])
+    ws.append([None, None, "NOMBRE DEL PROYECTO: PLANTA SINTETICA"])
+    ws.append([])
+    ws.append([])
+    ws.append(ENCABEZADO + [f"CAMPO ERP {k}" for k in range(extra)])
+    for it in items_dicts(n):
+        ws.append([
+            int(it["no_sc"]), it["titulo"], it["descripcion"], it["estatus_sc_raw"], it["estatus_oc_raw"] or None,
+            int(it["no_oc"]) if it["no_oc"] else None,
+            it["fecha_prometida"].to_pydatetime(),
+            None if pd.isna(it["fecha_llegada"]) else it["fecha_llegada"].to_pydatetime(),
+            rnd.randint(0, 9),
+        ] + [rnd.random() if k % 2 else f"DATO {k}" for k in range(extra)])
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def por_escaneo(b: bytes) -> pd.DataFrame:
+    pd.read_excel(BytesIO(b), header=None, engine="openpyxl")  # nombre (C4) con el libro completo
+    raw = pd.read_excel(BytesIO(b), header=None, engine="openpyxl")
+    header_row = next(i for i in range(len(raw)) if "No. S.C." in raw.iloc[i].astype(str).tolist())
+    df = pd.read_excel(BytesIO(b), header=header_row, engine="openpyxl")
+    df.columns = [limpiar_columna(c) for c in df.columns]
+    return df, header_row
+
+
+def por_diseno(registro: RegistroDisenos, b: bytes) -> pd.DataFrame:
+    pd.read_excel(BytesIO(b), header=None, nrows=4, engine="openpyxl")  # nombre (C4)
+    df, _ = registro.leer(b)
+    return df
+
+
+def medir(nombre, fn, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        out = fn()
+        seg = time.perf_counter() - t0
+        mejor = seg if mejor is None else min(mejor, seg)
+    print(f"{nombre:<16} {mejor:7.2f} s")
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    extra = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    b = libro(n, extra)
+    print(f"{n:,} partidas x {len(ENCABEZADO) + extra} columnas ({len(b) / 2**20:.1f} MiB)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registro = RegistroDisenos(os.path.join(tmp, "disenos.json"))
+        df_esc, header_row = medir("escaneo", lambda: por_escaneo(b))
+        _, primeras = registro.leer(b)
+        registro.aprender(primeras, header_row, list(df_esc.columns))
+        df_dis = medir("diseño conocido", lambda: por_diseno(registro, b))
+
+    desc = columna_descripcion(list(df_esc.columns))
+    esperado = df_esc.rename(columns={desc: COL_DESCRIPCION})[list(df_dis.columns)]
+    pd.testing.assert_frame_equal(esperado, df_dis)
+    print(f"mismo DataFrame en las {len(df_dis.columns)} columnas usadas")
+
+
+if __name__ == "__main__":
+    main()
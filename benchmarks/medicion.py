@@ -0,0 +1,48 @@
+import os
+import threading
+
+# =========================
+# MEDICIÓN DE MEMORIA (RSS)
+# =========================
+# tracemalloc vuelve 10x más lento a openpyxl, así que para corridas largas
+# se muestrea el RSS del proceso en un hilo aparte.
+
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes(pid: str = "self") -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGINA
+    except OSError:
+        import psutil  # fuera de Linux
+        return psutil.Process(None if pid == "self" else int(pid)).memory_info().rss
+
+
+class PicoRSS:
+    """Con `with PicoRSS() as m:` deja en m.pico / m.inicio el RSS máximo y el inicial."""
+
+    def __init__(self, intervalo: float = 0.01, pid: str = "self"):
+        self.intervalo = intervalo
+        self.pid = pid
+        self.inicio = self.pico = 0
+        self._fin = threading.Event()
+
+    def _muestrear(self):
+        while not self._fin.wait(self.intervalo):
+            self.pico = max(self.pico, rss_bytes(self.pid))
+
+    def __enter__(self):
+        self.inicio = self.pico = rss_bytes(self.pid)
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        self._hilo.join()
+        self.pico = max(self.pico, rss_bytes(self.pid))
+
+    @property
+    def incremento(self) -> int:
+        return self.pico - self.inicio
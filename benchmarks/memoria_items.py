@@ -0,0 +1,49 @@
+"""Memoria retenida por las partidas de un proyecto: lista de dicts vs ItemsCompactos.
+
+Uso: python benchmarks/memoria_items.py [n_items]
+"""
+import os
+import sys
+import gc
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from items_compactos import ItemsCompactos
+from sintetico import items_dicts
+
+
+def medir(fn):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = fn()
+    seg = time.perf_counter() - t0
+    gc.collect()
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, actual, pico, seg
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    dicts, mem_dicts, _, _ = medir(lambda: items_dicts(n))
+    del dicts
+    # Los dicts de origen se liberan dentro de la medición: solo queda lo compacto
+    compactos, mem_comp, pico_comp, _ = medir(lambda: ItemsCompactos.desde_dicts(items_dicts(n)))
+
+    print(f"items: {n:,}")
+    print(f"lista de dicts : {mem_dicts / 2**20:8.1f} MiB retenidos")
+    print(f"ItemsCompactos : {mem_comp / 2**20:8.1f} MiB retenidos "
+          f"(pico al generar y convertir {pico_comp / 2**20:.1f} MiB)")
+    print(f"reducción      : {mem_dicts / max(mem_comp, 1):8.1f}x")
+
+    t0 = time.perf_counter()
+    df = compactos.a_dataframe()
+    print(f"a_dataframe    : {time.perf_counter() - t0:8.3f} s ({len(df):,} filas)")
+
+
+if __name__ == "__main__":
+    main()
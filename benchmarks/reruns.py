@@ -0,0 +1,226 @@
+"""Tiempo de rerun por interacción del dashboard, antes y después de un cambio.
+
+Uso: python benchmarks/reruns.py [--antes REF] [--repeticiones 5]
+                                 [--proyectos 50] [--items 2000] [--pdfs 5] [--pdf-mb 1]
+
+Ejecuta app.py con AppTest en modo administrador sobre una BD y PDFs
+sintéticos (sintetico.preparar, como carga_sesiones.py) y mide, para cada
+interacción, lo que tarda el rerun que provoca en el navegador:
+  - "app":        el script completo
+  - "fragmento":  solo el st.fragment que contiene el control
+  - "sin rerun":  el control no provoca rerun (expander sin estado,
+                  st.download_button con on_click="ignore")
+AppTest siempre reejecuta el script completo, así que los reruns de
+fragmento se piden directamente al ScriptRunner con el id del fragmento.
+--antes REF mide también el app.py de ese commit (git show REF:app.py).
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+
+from sintetico import preparar
+
+APP = os.path.join(RAIZ, "app.py")
+
+# =========================
+# RERUN DE FRAGMENTO EN AppTest
+# =========================
+_run_original = local_script_runner.LocalScriptRunner.run
+_estado = {"fragmento": None, "mensajes": []}
+
+
+def _run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+    fragmento = _estado["fragmento"]
+    if fragmento is None:
+        tree = _run_original(self, widget_state, query_params, timeout, page_hash)
+        _estado["mensajes"] = list(self.forward_msgs())
+        return tree
+    # Reemplaza el rerun completo inicial del runner por uno del fragmento
+    self._requests._rerun_data = RerunData(
+        widget_states=widget_state,
+        page_script_hash=page_hash,
+        fragment_id_queue=[fragmento],
+        is_fragment_scoped_rerun=True,
+    )
+    try:
+        if not self._script_thread:
+            self.start()
+        local_script_runner.require_widgets_deltas(self, timeout)
+    finally:
+        self.join()
+    return parse_tree_from_messages(self.forward_msgs())
+
+
+local_script_runner.LocalScriptRunner.run = _run
+
+
+def fragmento_de(marca: str):
+    # Fragmento más interno que dibujó un elemento con esa key o etiqueta
+    for m in _estado["mensajes"]:
+        if m.HasField("delta") and m.delta.fragment_id and marca in str(m.delta):
+            return m.delta.fragment_id
+    return None
+
+
+def aparece(marca: str) -> bool:
+    return any(m.HasField("delta") and marca in str(m.delta) for m in _estado["mensajes"])
+
+
+# =========================
+# INTERACCIONES
+# =========================
+def _casilla(at, etiqueta):
+    return next(c for c in at.checkbox if c.label == etiqueta)
+
+
+def elegir_proyecto(at, i):
+    sel = at.selectbox(key="select_proyecto")
+    sel.select(sel.options[(i + 1) % len(sel.options)])
+
+
+def filtrar_proyectos(at, i):
+    at.text_input(key="filtro_proyecto").set_value(["SINTETICO 00", "PROYECTO"][i % 2])
+
+
+def tendencia_por_estado(at, i):
+    at.toggle(key="tend_apilado").set_value(i % 2 == 0)
+
+
+def buscar(at, i):
+    at.text_input(key="busqueda_global").set_value(["valvula 12", "compuerta 7"][i % 2])
+
+
+def abrir_tabla_completa(at, i):
+    at.session_state["exp_tabla_completa"] = True
+
+
+def cerrar_tabla_completa(at):
+    at.session_state["exp_tabla_completa"] = False
+
+
+def casilla_admin(at, i):
+    _casilla(at, "Eliminar duplicados dentro del proyecto").set_value(i % 2 == 1)
+
+
+# (nombre, marca del control, aplicar, restaurar antes de cada medición)
+INTERACCIONES = [
+    ("elegir proyecto", "select_proyecto", elegir_proyecto, None),
+    ("filtrar proyectos", "filtro_proyecto", filtrar_proyectos, None),
+    ("tendencia por estado", "tend_apilado", tendencia_por_estado, None),
+    ("buscar en proyectos", "busqueda_global", buscar, None),
+    ("abrir tabla completa", "exp_tabla_completa", abrir_tabla_completa, cerrar_tabla_completa),
+    ("descargar exportación", ".xlsx (", None, None),
+    ("casilla carga admin", "Eliminar duplicados dentro del proyecto", casilla_admin, None),
+    ("descargar PDF", "nota_0.pdf", None, None),
+]
+
+
+def abrir(app):
+    at = AppTest.from_file(app, default_timeout=600)
+    at.session_state["modo"] = "admin"
+    at.session_state["admin_ok"] = True
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+def medir_interaccion(at, marca, aplicar, restaurar, repeticiones):
+    at.run()  # la medición anterior pudo dejar solo el árbol de un fragmento
+    if aplicar is None:
+        # Descarga: rerun completo salvo que el botón lo ignore
+        boton = next((b for b in at.download_button if marca in b.label), None)
+        if boton is None:
+            return "-", []
+        if boton.proto.ignore_rerun:
+            return "sin rerun", [0.0] * repeticiones
+        alcance, fragmento = "app", None
+    elif not aparece(marca):
+        # El control no existe o no tiene estado (expander clásico)
+        return "sin rerun", [0.0] * repeticiones
+    else:
+        fragmento = fragmento_de(marca)
+        alcance = "fragmento" if fragmento else "app"
+
+    tiempos = []
+    for i in range(repeticiones):
+        if restaurar:
+            restaurar(at)
+        at.run()  # árbol completo y estado de partida, sin medir
+        if aplicar:
+            aplicar(at, i)
+        _estado["fragmento"] = fragmento
+        t0 = time.perf_counter()
+        try:
+            at.run()
+        finally:
+            _estado["fragmento"] = None
+        tiempos.append(time.perf_counter() - t0)
+        if at.exception:
+            raise RuntimeError(f"{marca}: {at.exception[0].message}")
+    return alcance, tiempos
+
+
+def medir_app(app, repeticiones):
+    at = abrir(app)
+    resultados = {}
+    for nombre, marca, aplicar, restaurar in INTERACCIONES:
+        resultados[nombre] = medir_interaccion(at, marca, aplicar, restaurar, repeticiones)
+    return resultados
+
+
+def _fmt(res):
+    alcance, tiempos = res
+    if not tiempos:
+        return f"{'-':>9} {alcance:<10}"
+    return f"{median(tiempos) * 1000:9.1f} {alcance:<10}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--antes", help="commit con el app.py de referencia")
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--proyectos", type=int, default=50)
+    ap.add_argument("--items", type=int, default=2000)
+    ap.add_argument("--pdfs", type=int, default=5)
+    ap.add_argument("--pdf-mb", type=float, default=1.0)
+    args = ap.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        preparar(tmp, args.proyectos, args.items, args.pdfs, args.pdf_mb)
+        apps = {}
+        if args.antes:
+            ruta = os.path.join(tmp, "app_antes.py")
+            with open(ruta, "wb") as f:
+                f.write(subprocess.check_output(["git", "-C", RAIZ, "show", f"{args.antes}:app.py"]))
+            apps["antes"] = ruta
+        apps["después"] = APP
+
+        os.chdir(tmp)  # app.py usa rutas relativas (BD y pdf_notas)
+        try:
+            print(f"BD: {args.proyectos} proyectos x {args.items:,} items, {args.pdfs} PDFs de {args.pdf_mb:g} MB; "
+                  f"mediana de {args.repeticiones} reruns (ms)")
+            resultados = {k: medir_app(ruta, args.repeticiones) for k, ruta in apps.items()}
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'interacción':<22}" + "".join(f" {k + ' ms':>9} {'alcance':<10}" for k in resultados))
+    for nombre, *_ in INTERACCIONES:
+        print(f"{nombre:<22}" + "".join(" " + _fmt(r[nombre]) for r in resultados.values()))
+
+
+if __name__ == "__main__":
+    main()
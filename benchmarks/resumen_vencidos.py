@@ -0,0 +1,133 @@
+"""Tiempo del resumen diario de vencidos (vencidos.py) sobre muchos proyectos.
+
+Uso: python benchmarks/resumen_vencidos.py [n_proyectos] [items_por_proyecto] [dias]
+
+Por defecto 200 proyectos x 2,000 items y 30 corridas diarias. La BD se
+guarda como el dashboard (guardar_bd + publicar_colas). Mide:
+  - publicar:        colas de todos los proyectos (primer guardado)
+  - primera corrida: lee el manifiesto y todas las colas
+  - corrida diaria:  BD sin cambios, solo colas y marca
+  - tras recarga:    un proyecto se volvió a subir (otra fecha_carga)
+  - BD sin colas:    escrita por otro medio, se lee entera una vez
+  - escaneo:         referencia ingenua, leer la BD y revisar todos los items
+Al final compara lo reportado por las corridas con el escaneo completo.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import tempfile
+import datetime as dt
+from statistics import median
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+import numpy as np
+
+from items_compactos import ItemsCompactos, CODIGO_ESTADO, SIN_FECHA, EPOCA
+from vencidos import generar_resumen, publicar_colas, dir_colas
+from sintetico import proyectos, guardar_bd
+
+INICIO = (dt.date(2025, 3, 1) - EPOCA).days
+
+
+def escaneo(db: str, hoy: int) -> list:
+    # Todas las partidas abiertas con fecha prometida antes de hoy
+    with open(db, "r", encoding="utf-8") as f:
+        proys = json.load(f)
+    cerrado = [CODIGO_ESTADO["CANCELADO"], CODIGO_ESTADO["COMPLETADO"]]
+    out = []
+    for p in proys:
+        items = ItemsCompactos.desde_json(p["resumen"]["items"])
+        prom = np.frombuffer(items.fecha["fecha_prometida"], dtype=np.int64)
+        lleg = np.frombuffer(items.fecha["fecha_llegada"], dtype=np.int64)
+        ok = (prom != SIN_FECHA) & (lleg == SIN_FECHA) & (prom < hoy)
+        for c in ["estatus_sc", "estatus_oc"]:
+            ok &= ~np.isin(np.frombuffer(items.estado[c], dtype=np.int8), cerrado)
+        for i in np.flatnonzero(ok):
+            out.append((p["nombre"], items.texto["no_sc"][i], items.texto["descripcion"][i], int(prom[i])))
+    return out
+
+
+def leidas(ruta: str) -> list:
+    with open(ruta, "r", encoding="utf-8-sig", newline="") as f:
+        filas = list(csv.reader(f))[1:]
+    return [
+        (r[0], r[2], r[4], (dt.datetime.strptime(r[5], "%Y-%m-%d").date() - EPOCA).days)
+        for r in filas
+    ]
+
+
+def main():
+    n_proy = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    por_proy = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    dias = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "db_proyectos.json")
+        estado = os.path.join(tmp, "vencidos_estado.json")
+        salida = os.path.join(tmp, "resumen")
+        proys = proyectos(n_proy, por_proy)
+        guardar_bd(proys, db)
+        print(f"{n_proy} proyectos x {por_proy:,} items (BD {os.path.getsize(db) / 2**20:.1f} MiB), {dias} días")
+
+        def publicar():
+            t0 = time.perf_counter()
+            n = publicar_colas(proys, db)
+            return time.perf_counter() - t0, n
+
+        seg, n = publicar()
+        print(f"{'publicar':<18} {seg * 1000:8.1f} ms  {n} colas (al guardar en el dashboard)")
+
+        reportadas = []
+
+        def correr(hoy):
+            t0 = time.perf_counter()
+            res = generar_resumen(db, estado, salida, hoy)
+            seg = time.perf_counter() - t0
+            for ruta in res["archivos"]:
+                if ruta.endswith(".csv"):
+                    reportadas.extend(leidas(ruta))
+            return seg, res
+
+        seg, res = correr(INICIO)
+        print(f"{'primera corrida':<18} {seg * 1000:8.1f} ms  {res['vencidos']:>7,} vencidas  {res['rearmados']} rearmados")
+
+        tiempos, total = [], 0
+        for d in range(1, dias):
+            seg, res = correr(INICIO + d)
+            tiempos.append(seg)
+            total += res["vencidos"]
+        print(f"{'corrida diaria':<18} {median(tiempos) * 1000:8.1f} ms  {total / max(1, dias - 1):>7,.0f} vencidas/día "
+              f"(mediana, máx {max(tiempos) * 1000:.1f} ms)")
+
+        # Se vuelve a subir un proyecto: misma BD, otra fecha_carga
+        proys[0]["fecha_carga"] = dt.datetime(2025, 4, 1).isoformat(timespec="seconds")
+        guardar_bd(proys, db)
+        seg, n = publicar()
+        print(f"{'publicar':<18} {seg * 1000:8.1f} ms  {n} colas (tras recarga)")
+        seg, res = correr(INICIO + dias)
+        print(f"{'tras recarga':<18} {seg * 1000:8.1f} ms  {res['vencidos']:>7,} vencidas  {res['rearmados']} rearmados")
+
+        # Otra recarga escrita sin publicar colas: el job las publica desde la BD
+        proys[1]["fecha_carga"] = dt.datetime(2025, 4, 2).isoformat(timespec="seconds")
+        guardar_bd(proys, db)
+        shutil.rmtree(dir_colas(db))
+        fin = INICIO + dias + 1
+        seg, res = correr(fin)
+        print(f"{'BD sin colas':<18} {seg * 1000:8.1f} ms  {res['vencidos']:>7,} vencidas  {res['rearmados']} rearmados")
+
+        t0 = time.perf_counter()
+        esperado = escaneo(db, fin)
+        print(f"{'escaneo':<18} {(time.perf_counter() - t0) * 1000:8.1f} ms  (referencia: toda la BD)")
+
+    # Lo vencido antes de INICIO sale en la primera corrida; después, cada partida una sola vez
+    assert sorted(reportadas) == sorted(esperado), "lo reportado no coincide con el escaneo"
+    print(f"mismas partidas que el escaneo: {len(esperado):,}, ninguna repetida")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import json
+import random
+import datetime as dt
+
+import pandas as pd
+
+# =========================
+# DATOS SINTÉTICOS
+# =========================
+# Partidas con la misma forma que produce procesar_resumen: textos repetidos
+# por requisición / OC, letras de estatus y fechas como Timestamp.
+
+ESTATUS_SC = ["A", "Q", "U", "P", "R"]
+ESTATUS_OC = ["A", "C", "P", ""]
+MAPEO_SC = {"A": "COMPLETADO", "Q": "SIN PEDIDO", "U": "CANCELADO"}
+MAPEO_OC = {"A": "COMPLETADO", "C": "CANCELADO"}
+
+
+def items_dicts(n: int, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+    base = dt.date(2025, 1, 6)
+    items = []
+    for i in range(n):
+        sc = rnd.choice(ESTATUS_SC)
+        oc = rnd.choice(ESTATUS_OC)
+        req = i // 25
+        prom = pd.Timestamp(base + dt.timedelta(days=rnd.randint(0, 360)))
+        lleg = prom + pd.Timedelta(days=rnd.randint(-5, 40)) if rnd.random() < 0.6 else pd.NaT
+        # f-strings: cada celda es un objeto distinto, como al leer el Excel
+        items.append({
+            "no_sc": f"{10000 + req}",
+            "titulo": f"REQUISICION DE MATERIALES AREA {req % 40}",
+            "descripcion": f"VALVULA COMPUERTA {i % 900} PULG CLASE 150",
+            "estatus_sc_raw": f"{sc}",
+            "estatus_oc_raw": f"{oc}",
+            "no_oc": f"{4500000 + i // 10}" if rnd.random() < 0.85 else "",
+            "fecha_prometida": prom,
+            "fecha_llegada": lleg,
+            "estatus_sc": f"{MAPEO_SC.get(sc, 'PENDIENTE A LLEGAR')}",
+            "estatus_oc": f"{MAPEO_OC.get(oc, 'PENDIENTE A LLEGAR')}",
+        })
+    return items
+
+
+def proyectos(n_proyectos: int, items_por_proyecto: int, seed: int = 7) -> list:
+    # Proyectos con la forma de st.session_state.proyectos (items ya compactos)
+    from items_compactos import ItemsCompactos, a_dias_epoca
+
+    out = []
+    for k in range(n_proyectos):
+        items = ItemsCompactos.desde_dicts(items_dicts(items_por_proyecto, seed=seed + k))
+        criticos = [
+            {
+                "No. S.C.": it["no_sc"],
+                "Título": it["titulo"],
+                "Estatus S.C.": it["estatus_sc"],
+                "Estatus O.C.": it["estatus_oc"],
+                "Fecha prometida": a_dias_epoca(it["fecha_prometida"]) if it["fecha_prometida"] else None,
+            }
+            for it in items
+            if it["estatus_sc"] == "CANCELADO" or it["estatus_oc"] == "CANCELADO"
+        ]
+        out.append({
+            "id": f"proj_sintetico_{k}",
+            "nombre": f"PROYECTO SINTETICO {k:04d}",
+            "fecha_carga": dt.datetime(2025, 1, 1).isoformat(timespec="seconds"),
+            "archivo": f"sintetico_{k}.xlsx",
+            "resumen": resumen_sintetico(items, criticos),
+        })
+    return out
+
+
+def resumen_sintetico(items, criticos: list) -> dict:
+    # Los mismos campos que guarda procesar_resumen y que usa el dashboard
+    from items_compactos import CODIGO_ESTADO
+    from tendencias import construir_tendencias
+
+    clases = []
+    for no_oc, sc, oc in zip(items.texto["no_oc"], items.estado["estatus_sc"], items.estado["estatus_oc"]):
+        if no_oc in ["", "0"]:
+            clases.append("SIN OC")
+        elif CODIGO_ESTADO["CANCELADO"] in (sc, oc):
+            clases.append("CANCELADO")
+        elif CODIGO_ESTADO["COMPLETADO"] in (sc, oc):
+            clases.append("COMPLETADO")
+        else:
+            clases.append("PENDIENTE A LLEGAR")
+    tendencias = construir_tendencias(items, clases)
+    semanas = tendencias["semana"]["prometida"]
+    trend = [
+        {"SEMANA": d, "solicitudes": sum(n)}
+        for d, n in zip(semanas["inicio"], zip(*semanas["conteos"].values()))
+    ]
+    return {
+        "total_registros": len(items),
+        "total_disponible": 0.0,
+        "criticos": criticos,
+        "items": items,
+        "sin_oc_real": clases.count("SIN OC"),
+        "conteo_general": {c: clases.count(c) for c in set(clases)},
+        "trend": trend,
+        "tendencias": tendencias,
+    }
+
+
+def guardar_bd(proyectos_: list, ruta: str):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(proyectos_, f, ensure_ascii=False, default=lambda o: o.a_json())
+
+
+def preparar(directorio: str, n_proyectos: int, items: int, n_pdfs: int, pdf_mb: float) -> list:
+    # BD y pdf_notas como los deja el dashboard, para correr app.py en directorio
+    proys = proyectos(n_proyectos, items)
+    guardar_bd(proys, os.path.join(directorio, "db_proyectos.json"))
+    os.makedirs(os.path.join(directorio, "pdf_notas"), exist_ok=True)
+    for i in range(n_pdfs):
+        with open(os.path.join(directorio, "pdf_notas", f"nota_{i}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n" + os.urandom(int(pdf_mb * 2**20)))
+    return [p["nombre"] for p in proys]
@@ -0,0 +1,158 @@
+import re
+import heapq
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+# =========================
+# ÍNDICE DE BÚSQUEDA
+# =========================
+# Índice invertido sobre descripcion / titulo / no_sc / no_oc de todos los
+# proyectos. Cada token apunta a {id de proyecto: posiciones de items}.
+# Se actualiza por proyecto: al reemplazar uno solo se reindexa ese.
+# Hay uno solo por proceso, compartido por todas las sesiones (lock); se
+# arma en otro hilo al arrancar y las búsquedas esperan a que termine.
+
+CAMPOS_BUSQUEDA = ["descripcion", "titulo", "no_sc", "no_oc"]
+TOKEN_RE = re.compile(r"[A-Z0-9]+")
+
+
+def normalizar(texto: str) -> str:
+    s = unicodedata.normalize("NFKD", str(texto or "")).encode("ascii", "ignore").decode()
+    return s.upper()
+
+
+def tokens(texto: str) -> list:
+    return TOKEN_RE.findall(normalizar(texto))
+
+
+class IndiceBusqueda:
+    def __init__(self):
+        self.postings = {}          # token -> {pid: array de posiciones}
+        self.tokens_proyecto = {}   # pid -> tokens indexados (para poder quitarlos)
+        self.items_proyecto = {}    # pid -> objeto items indexado
+        self.versiones = {}         # pid -> "id|fecha_carga|n items" indexada
+        self._vocab = None          # tokens ordenados, para búsqueda por prefijo
+        self._lock = threading.RLock()
+        self._listo = threading.Event()
+        self._listo.set()
+
+    def _agregar(self, pid, items, version):
+        if pid in self.tokens_proyecto:
+            self._quitar(pid)
+        por_token = {}
+        cache = {}  # los valores se repiten mucho (títulos, No. O.C.)
+        for campo in CAMPOS_BUSQUEDA:
+            for i, valor in enumerate(items.texto[campo]):
+                ts = cache.get(valor)
+                if ts is None:
+                    ts = cache[valor] = tokens(valor)
+                for t in ts:
+                    por_token.setdefault(t, set()).add(i)
+        for t, posiciones in por_token.items():
+            self.postings.setdefault(t, {})[pid] = array("I", sorted(posiciones))
+        self.tokens_proyecto[pid] = set(por_token)
+        self.items_proyecto[pid] = items
+        self.versiones[pid] = version
+        self._vocab = None
+
+    def _quitar(self, pid):
+        for t in self.tokens_proyecto.pop(pid, ()):
+            por_pid = self.postings.get(t, {})
+            por_pid.pop(pid, None)
+            if not por_pid:
+                self.postings.pop(t, None)
+        self.items_proyecto.pop(pid, None)
+        self.versiones.pop(pid, None)
+        self._vocab = None
+
+    def sincronizar(self, proyectos: list):
+        # Reindexa solo proyectos nuevos o con otra versión; quita los que ya no existen.
+        # La versión lleva el número de items: el dedup del admin no cambia fecha_carga.
+        with self._lock:
+            vigentes = set()
+            for p in proyectos:
+                pid = p.get("id") or p.get("nombre")
+                items = p.get("resumen", {}).get("items")
+                vigentes.add(pid)
+                if items is None:
+                    continue
+                version = f"{p.get('id', '')}|{p.get('fecha_carga', '')}|{len(items)}"
+                if self.versiones.get(pid) != version or pid not in self.tokens_proyecto:
+                    self._agregar(pid, items, version)
+            for pid in list(self.tokens_proyecto):
+                if pid not in vigentes:
+                    self._quitar(pid)
+
+    def sincronizar_en_fondo(self, proyectos: list):
+        # Primer armado fuera de la sesión que lo pide; buscar_partidas espera
+        self._listo.clear()
+
+        def armar():
+            try:
+                self.sincronizar(proyectos)
+            finally:
+                self._listo.set()
+
+        threading.Thread(target=armar, name="indice-busqueda", daemon=True).start()
+
+    def _tokens_prefijo(self, prefijo: str) -> list:
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        out = []
+        j = bisect_left(self._vocab, prefijo)
+        while j < len(self._vocab) and self._vocab[j].startswith(prefijo):
+            out.append(self._vocab[j])
+            j += 1
+        return out
+
+    def _tamano(self, toks: list) -> int:
+        return sum(len(pos) for t in toks for pos in self.postings[t].values())
+
+    def _coincide(self, pid, i: int, terminos: list) -> bool:
+        items = self.items_proyecto[pid]
+        toks = [t for campo in CAMPOS_BUSQUEDA for t in tokens(items.texto[campo][i])]
+        return all(any(t.startswith(term) for t in toks) for term in terminos)
+
+    def buscar_partidas(self, consulta: str, limite: int = 200) -> list:
+        # -> [(pid, items coincidentes)]; bajo el mismo lock que la búsqueda
+        # para que otra sesión no reindexe entre los hits y sus items
+        self._listo.wait()
+        with self._lock:
+            por_pid = {}
+            for pid, i in self._buscar(consulta, limite):
+                por_pid.setdefault(pid, []).append(i)
+            return [(pid, self.items_proyecto[pid].seleccionar(pos)) for pid, pos in por_pid.items()]
+
+    def _buscar(self, consulta: str, limite: int) -> list:
+        # Todos los términos deben aparecer (como prefijo de algún token) en el item.
+        # Se recorren las posiciones del término más selectivo y el resto se
+        # verifica sobre el texto del item, cortando al llegar al límite.
+        terminos = sorted(set(tokens(consulta)))
+        if not terminos:
+            return []
+        expandidos = {term: self._tokens_prefijo(term) for term in terminos}
+        if not all(expandidos.values()):
+            return []
+        guia = min(terminos, key=lambda term: self._tamano(expandidos[term]))
+        otros = [term for term in terminos if term != guia]
+
+        por_pid = {}
+        for t in expandidos[guia]:
+            for pid, pos in self.postings[t].items():
+                por_pid.setdefault(pid, []).append(pos)
+
+        hits = []
+        for pid in sorted(por_pid):
+            anterior = -1
+            for i in heapq.merge(*por_pid[pid]):
+                if i == anterior:
+                    continue
+                anterior = i
+                if otros and not self._coincide(pid, i, otros):
+                    continue
+                hits.append((pid, i))
+                if len(hits) >= limite:
+                    return hits
+        return hits
@@ -0,0 +1,163 @@
+import os
+import json
+import hashlib
+import threading
+import datetime as dt
+from io import BytesIO
+from itertools import islice
+
+import numpy as np
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from pandas.io.parsers import TextParser
+
+# =========================
+# REGISTRO DE DISEÑOS DE EXCEL
+# =========================
+# El ERP genera pocos diseños de reporte. De cada uno se guarda la fila de
+# encabezado y qué columnas usa procesar_resumen, identificado por la
+# huella de esa fila (índice + textos). Con un diseño conocido se lee el
+# libro una sola vez con openpyxl y solo se convierten esas columnas; uno
+# nuevo pasa por el escaneo de siempre (leer_tabla_excel) y se registra.
+#   {huella: {"fila_encabezado": 6, "encabezado": [...],
+#             "columnas": [[indice, nombre], ...], "alta": iso}}
+
+DISENOS_FILE = "disenos_excel.json"
+FILAS_HUELLA = 30   # filas iniciales donde se busca un encabezado conocido
+ENCABEZADO_CLAVE = "No. S.C."
+COL_DESCRIPCION = "DESCRIPCION DE LA PARTIDA"
+COLUMNAS_USADAS = {
+    "NO. S.C.", "TITULO DE LA REQUISICION", COL_DESCRIPCION, "ESTATUS S.C.",
+    "ESTATUS O.C.", "NO. O.C.", "FECHA PROMETIDA", "FECHA DE LLEGADA", "CANT DISPONIBLE",
+}
+
+
+def limpiar_columna(c) -> str:
+    return str(c).replace("\n", " ").strip()
+
+
+def columna_descripcion(columnas: list):
+    # Nombre exacto o la primera que contenga DESCRIPCION y PARTIDA
+    if COL_DESCRIPCION in columnas:
+        return COL_DESCRIPCION
+    cand = [c for c in columnas if "DESCRIPCION" in c.upper() and "PARTIDA" in c.upper()]
+    return cand[0] if cand else None
+
+
+def _texto_celda(v) -> str:
+    return "" if v is None else str(v)
+
+
+def _fila_encabezado(fila) -> list:
+    textos = [_texto_celda(v) for v in fila]
+    while textos and textos[-1] == "":
+        textos.pop()
+    return textos
+
+
+def huella(indice: int, encabezado: list) -> str:
+    return hashlib.sha1(json.dumps([indice, encabezado], ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def _valor(v):
+    # Misma conversión de celda que pandas.read_excel (motor openpyxl)
+    if v is None:
+        return ""
+    if isinstance(v, float):
+        entero = int(v)
+        return entero if entero == v else v
+    if isinstance(v, str) and v in ERROR_CODES:
+        return np.nan
+    return v
+
+
+def primeras_filas(file_bytes: bytes) -> tuple:
+    # (libro, iterador de filas ya posicionado, primeras FILAS_HUELLA filas)
+    wb = load_workbook(BytesIO(file_bytes), read_only=True, data_only=True, keep_links=False)
+    ws = wb.worksheets[0]
+    ws.reset_dimensions()
+    filas = ws.iter_rows(values_only=True)
+    return wb, filas, list(islice(filas, FILAS_HUELLA))
+
+
+def _filas_desde(primeras: list, resto, inicio: int):
+    yield from primeras[inicio:]
+    yield from resto
+
+
+class RegistroDisenos:
+    def __init__(self, ruta: str = DISENOS_FILE):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self.disenos = {}
+        if os.path.exists(ruta):
+            try:
+                with open(ruta, "r", encoding="utf-8") as f:
+                    self.disenos = json.load(f)
+            except (OSError, ValueError):
+                self.disenos = {}
+
+    def __len__(self):
+        return len(self.disenos)
+
+    def _guardar(self):
+        tmp = self.ruta + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.disenos, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.ruta)
+
+    def identificar(self, primeras: list):
+        # Solo se prueban las filas donde algún diseño tiene su encabezado
+        for fila in sorted({d["fila_encabezado"] for d in self.disenos.values()}):
+            if fila >= len(primeras):
+                continue
+            d = self.disenos.get(huella(fila, _fila_encabezado(primeras[fila])))
+            # El escaneo se queda con la primera fila que tenga "No. S.C."
+            if d is not None and not any(ENCABEZADO_CLAVE in f for f in primeras[:fila]):
+                return d
+        return None
+
+    def aprender(self, primeras: list, fila_encabezado: int, columnas: list):
+        # columnas: nombres limpios del DataFrame leído por el escaneo
+        if fila_encabezado >= len(primeras):
+            return None
+        desc = columna_descripcion(columnas)
+        usadas, vistas = [], set()
+        for i, c in enumerate(columnas):
+            nombre = COL_DESCRIPCION if c == desc else c
+            if nombre.upper() in COLUMNAS_USADAS and nombre.upper() not in vistas:
+                vistas.add(nombre.upper())
+                usadas.append([i, nombre])
+        encabezado = _fila_encabezado(primeras[fila_encabezado])
+        d = {
+            "fila_encabezado": fila_encabezado,
+            "encabezado": encabezado,
+            "columnas": usadas,
+            "alta": dt.datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self.disenos[huella(fila_encabezado, encabezado)] = d
+            self._guardar()
+        return d
+
+    def leer(self, file_bytes: bytes):
+        # -> (DataFrame o None si el diseño no se conoce, primeras filas)
+        wb, filas, primeras = primeras_filas(file_bytes)
+        try:
+            d = self.identificar(primeras)
+            if d is None:
+                return None, primeras
+
+            indices = [i for i, _ in d["columnas"]]
+            datos = [[nombre for _, nombre in d["columnas"]]]
+            ultima = 0   # última fila con algún valor (pandas recorta las vacías del final)
+            for fila in _filas_desde(primeras, filas, d["fila_encabezado"] + 1):
+                n = len(fila)
+                datos.append([_valor(fila[i]) if i < n else "" for i in indices])
+                if any(v not in (None, "") for v in fila):
+                    ultima = len(datos) - 1
+        finally:
+            wb.close()
+
+        df = TextParser(datos[:ultima + 1], header=0, skip_blank_lines=False).read()
+        return df, primeras
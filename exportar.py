@@ -0,0 +1,88 @@
+import csv
+import io
+
+from openpyxl import Workbook
+
+from items_compactos import ESTADOS_ORDEN, COLS_FECHA, desde_dias_epoca
+
+# =========================
+# EXPORTACIÓN (CSV / XLSX)
+# =========================
+# Se escribe fila por fila desde los items guardados: sin DataFrame ni
+# Styler intermedio. El XLSX usa el modo write_only de openpyxl.
+
+ENCABEZADO_ITEMS = [
+    "Proyecto", "No. S.C.", "Título", "Descripción", "No. O.C.",
+    "Estatus S.C.", "Estatus O.C.", "Fecha prometida", "Fecha llegada",
+]
+ENCABEZADO_CRITICOS = ["Proyecto", "No. S.C.", "Título", "Estatus S.C.", "Estatus O.C.", "Fecha prometida"]
+
+
+def _estado(code: int) -> str:
+    return ESTADOS_ORDEN[code] if code >= 0 else ""
+
+
+def filas_items(proyectos: list):
+    for p in proyectos:
+        nombre = p.get("nombre", "")
+        items = p.get("resumen", {}).get("items")
+        if items is None:
+            continue
+        t, e, f = items.texto, items.estado, items.fecha
+        columnas = zip(
+            t["no_sc"], t["titulo"], t["descripcion"], t["no_oc"],
+            e["estatus_sc"], e["estatus_oc"], *(f[c] for c in COLS_FECHA),
+        )
+        for no_sc, titulo, desc, no_oc, sc, oc, prom, lleg in columnas:
+            yield (
+                nombre, no_sc, titulo, desc, no_oc,
+                _estado(sc), _estado(oc), desde_dias_epoca(prom), desde_dias_epoca(lleg),
+            )
+
+
+def filas_criticos(proyectos: list):
+    for p in proyectos:
+        nombre = p.get("nombre", "")
+        for c in p.get("resumen", {}).get("criticos", []):
+            yield (
+                nombre, c.get("No. S.C.", "-"), c.get("Título", ""),
+                c.get("Estatus S.C.", ""), c.get("Estatus O.C.", ""),
+                desde_dias_epoca(c.get("Fecha prometida")),
+            )
+
+
+def escribir_csv(destino, encabezado: list, filas) -> int:
+    # destino: archivo binario; utf-8-sig para que Excel respete los acentos
+    texto = io.TextIOWrapper(destino, encoding="utf-8-sig", newline="", write_through=True)
+    w = csv.writer(texto)
+    w.writerow(encabezado)
+    n = 0
+    for fila in filas:
+        w.writerow(["" if v is None else v for v in fila])
+        n += 1
+    texto.flush()
+    texto.detach()
+    return n
+
+
+def escribir_xlsx(destino, encabezado: list, filas, hoja="Items") -> int:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(hoja)
+    ws.append(encabezado)
+    n = 0
+    for fila in filas:
+        ws.append(fila)
+        n += 1
+    wb.save(destino)
+    return n
+
+
+def exportar(proyectos: list, alcance: str, formato: str, destino) -> int:
+    # alcance: "items" o "criticos"; formato: "csv" o "xlsx"
+    if alcance == "criticos":
+        encabezado, filas, hoja = ENCABEZADO_CRITICOS, filas_criticos(proyectos), "Criticos"
+    else:
+        encabezado, filas, hoja = ENCABEZADO_ITEMS, filas_items(proyectos), "Items"
+    if formato == "xlsx":
+        return escribir_xlsx(destino, encabezado, filas, hoja=hoja)
+    return escribir_csv(destino, encabezado, filas)
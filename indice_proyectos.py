@@ -0,0 +1,98 @@
+from bisect import bisect_left, insort
+
+from busqueda import normalizar, tokens
+
+# =========================
+# ÍNDICE DE PROYECTOS
+# =========================
+# Proyectos por nombre (dict) + dos índices ordenados para el selector:
+#   - alfabético: (nombre normalizado, nombre)
+#   - recientes:  (fecha_carga, nombre), se recorre al revés
+# y uno por palabra del nombre para la búsqueda mientras se escribe.
+# Reemplazar un proyecto solo toca sus entradas, no reconstruye la lista.
+
+
+class IndiceProyectos:
+    def __init__(self, proyectos=()):
+        self.por_nombre = {}
+        self._alfabetico = []
+        self._recientes = []
+        self._palabras = []   # (palabra, nombre)
+        for p in proyectos:
+            self.upsert(p)
+
+    def __len__(self):
+        return len(self.por_nombre)
+
+    def __iter__(self):
+        return iter(self.por_nombre.values())
+
+    def __contains__(self, nombre):
+        return nombre in self.por_nombre
+
+    def obtener(self, nombre):
+        return self.por_nombre.get(nombre)
+
+    def _entradas(self, p):
+        nombre = p["nombre"]
+        return (
+            (normalizar(nombre), nombre),
+            (str(p.get("fecha_carga", "")), nombre),
+            [(t, nombre) for t in sorted(set(tokens(nombre)))],
+        )
+
+    @staticmethod
+    def _quitar(lista, entrada):
+        j = bisect_left(lista, entrada)
+        if j < len(lista) and lista[j] == entrada:
+            del lista[j]
+
+    def upsert(self, p):
+        nombre = p["nombre"]
+        anterior = self.por_nombre.pop(nombre, None)
+        if anterior is not None:
+            alfa, reciente, palabras = self._entradas(anterior)
+            self._quitar(self._alfabetico, alfa)
+            self._quitar(self._recientes, reciente)
+            for e in palabras:
+                self._quitar(self._palabras, e)
+
+        self.por_nombre[nombre] = p
+        alfa, reciente, palabras = self._entradas(p)
+        insort(self._alfabetico, alfa)
+        insort(self._recientes, reciente)
+        for e in palabras:
+            insort(self._palabras, e)
+
+    def _coincidencias(self, texto: str) -> set:
+        # Cada término debe ser prefijo de alguna palabra del nombre
+        terminos = tokens(texto)
+        resultado = None
+        for term in sorted(set(terminos), key=len, reverse=True):
+            nombres = set()
+            j = bisect_left(self._palabras, (term, ""))
+            while j < len(self._palabras) and self._palabras[j][0].startswith(term):
+                nombres.add(self._palabras[j][1])
+                j += 1
+            resultado = nombres if resultado is None else resultado & nombres
+            if not resultado:
+                return set()
+        return resultado
+
+    def buscar(self, texto: str = "", orden: str = "recientes", desde: int = 0, limite: int = 50) -> tuple[list, int]:
+        # Devuelve (nombres de la página, total de coincidencias)
+        if not tokens(texto):
+            total = len(self._alfabetico)
+            if orden == "recientes":
+                fin = max(total - desde, 0)
+                pagina = [n for _, n in reversed(self._recientes[max(fin - limite, 0):fin])]
+            else:
+                pagina = [n for _, n in self._alfabetico[desde:desde + limite]]
+            return pagina, total
+
+        coinciden = self._coincidencias(texto)
+        if orden == "recientes":
+            ordenados = sorted(coinciden, key=lambda n: (str(self.por_nombre[n].get("fecha_carga", "")), n), reverse=True)
+        else:
+            ordenados = sorted(coinciden, key=lambda n: (normalizar(n), n))
+        return ordenados[desde:desde + limite], len(coinciden)
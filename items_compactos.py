@@ -0,0 +1,190 @@
+import sys
+import datetime as dt
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# ITEMS COMPACTOS
+# =========================
+# Un proyecto guarda sus partidas como columnas (struct-of-arrays) en lugar
+# de un dict por item:
+#   - textos repetidos (título, No. O.C., letras de estatus) internados
+#   - estatus mapeados como códigos pequeños sobre ESTADOS_ORDEN
+#   - fechas como días desde 1970-01-01 (int64)
+# El DataFrame solo se arma al momento de mostrar la tabla.
+#
+# En el JSON se guardan igual, por columnas: estatus como códigos y fechas
+# como días (null = sin fecha). Las fechas se interpretan una sola vez, al
+# cargar el Excel; ninguna pantalla vuelve a parsear texto.
+
+ESTADOS_ORDEN = ["COMPLETADO", "PENDIENTE A LLEGAR", "SIN PEDIDO", "CANCELADO"]
+CODIGO_ESTADO = {e: i for i, e in enumerate(ESTADOS_ORDEN)}
+
+COLS_TEXTO = ["no_sc", "titulo", "descripcion", "no_oc", "estatus_sc_raw", "estatus_oc_raw"]
+COLS_ESTADO = ["estatus_sc", "estatus_oc"]
+COLS_FECHA = ["fecha_prometida", "fecha_llegada"]
+COLUMNAS = COLS_TEXTO + COLS_ESTADO + COLS_FECHA
+
+# Mismo valor que NaT en numpy: int64 mínimo
+SIN_FECHA = -(2 ** 63)
+EPOCA = dt.date(1970, 1, 1)
+# El ERP usa 31/12/9999 como "sin fecha": todo el año 9999 cuenta como vacío
+DIA_PLACEHOLDER = (dt.date(9999, 1, 1) - EPOCA).days
+
+
+def texto_compacto(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float):
+        if v != v:  # NaN
+            return ""
+        if v.is_integer():
+            v = int(v)
+    s = str(v).strip()
+    if s.lower() in ["nan", "nat", "none"]:
+        return ""
+    return sys.intern(s)
+
+
+def a_dias_epoca(v) -> int:
+    if v is None or v == "":
+        return SIN_FECHA
+    if isinstance(v, (int, np.integer)) and not isinstance(v, bool):
+        return int(v)
+    try:
+        ts = pd.Timestamp(v)
+    except (ValueError, TypeError):
+        return SIN_FECHA
+    if pd.isna(ts) or ts.year >= 9999:
+        return SIN_FECHA
+    return (ts.date() - EPOCA).days
+
+
+def dias_epoca(vals) -> array:
+    # Conversión vectorizada de una columna completa a días desde 1970-01-01
+    if not (isinstance(vals, np.ndarray) and vals.dtype.kind == "M"):
+        vals = list(vals)
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in vals):
+            return array("q", vals)
+        vals = pd.to_datetime(pd.Series(vals, dtype=object), errors="coerce", format="mixed").to_numpy()
+    # A días directo, sin pasar por ns (desborda después de 2262)
+    dias = vals.astype("datetime64[D]").astype(np.int64)
+    dias[dias >= DIA_PLACEHOLDER] = SIN_FECHA
+    return array("q", dias.tobytes())
+
+
+def desde_dias_epoca(d: int):
+    if d is None or d == SIN_FECHA:
+        return None
+    return EPOCA + dt.timedelta(days=int(d))
+
+
+def dia_json(d: int):
+    return None if d == SIN_FECHA else int(d)
+
+
+def hoy_dias_epoca() -> int:
+    return (dt.date.today() - EPOCA).days
+
+
+def fechas_desde_dias(dias) -> np.ndarray:
+    # Días (o None) -> datetime64, sin pasar por texto
+    return np.array([SIN_FECHA if d is None else d for d in dias], dtype=np.int64).astype("datetime64[D]")
+
+
+class ItemsCompactos:
+    __slots__ = ("texto", "estado", "fecha")
+
+    def __init__(self):
+        self.texto = {c: [] for c in COLS_TEXTO}
+        self.estado = {c: array("b") for c in COLS_ESTADO}
+        self.fecha = {c: array("q") for c in COLS_FECHA}
+
+    def __len__(self):
+        return len(self.texto["no_sc"])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.item(i)
+
+    @classmethod
+    def desde_columnas(cls, columnas: dict, n: int) -> "ItemsCompactos":
+        out = cls()
+        for c in COLS_TEXTO:
+            vals = columnas.get(c)
+            out.texto[c] = [texto_compacto(v) for v in vals] if vals is not None else [""] * n
+        for c in COLS_ESTADO:
+            vals = columnas.get(c)
+            out.estado[c] = array("b", [CODIGO_ESTADO.get(str(v).strip().upper(), -1) for v in vals] if vals is not None else [-1] * n)
+        for c in COLS_FECHA:
+            vals = columnas.get(c)
+            out.fecha[c] = dias_epoca(vals) if vals is not None else array("q", [SIN_FECHA] * n)
+        return out
+
+    @classmethod
+    def desde_dicts(cls, items: list) -> "ItemsCompactos":
+        items = list(items or [])
+        cols = {c: [it.get(c, "") for it in items] for c in COLUMNAS}
+        return cls.desde_columnas(cols, len(items))
+
+    @classmethod
+    def desde_json(cls, obj) -> "ItemsCompactos":
+        if isinstance(obj, ItemsCompactos):
+            return obj
+        if not isinstance(obj, dict):
+            # BD vieja: lista de dicts con fechas como texto (se parsean aquí, una vez)
+            return cls.desde_dicts(obj)
+        out = cls()
+        n = len(obj.get("no_sc", []))
+        for c in COLS_TEXTO:
+            out.texto[c] = [sys.intern(v) for v in obj.get(c, [""] * n)]
+        for c in COLS_ESTADO:
+            out.estado[c] = array("b", obj.get(c, [-1] * n))
+        for c in COLS_FECHA:
+            out.fecha[c] = array("q", [SIN_FECHA if d is None else d for d in obj.get(c, [None] * n)])
+        return out
+
+    def a_json(self) -> dict:
+        out = {c: self.texto[c] for c in COLS_TEXTO}
+        for c in COLS_ESTADO:
+            out[c] = self.estado[c].tolist()
+        for c in COLS_FECHA:
+            out[c] = [dia_json(d) for d in self.fecha[c]]
+        return out
+
+    def item(self, i: int) -> dict:
+        it = {c: self.texto[c][i] for c in COLS_TEXTO}
+        for c in COLS_ESTADO:
+            code = self.estado[c][i]
+            it[c] = ESTADOS_ORDEN[code] if code >= 0 else ""
+        for c in COLS_FECHA:
+            it[c] = desde_dias_epoca(self.fecha[c][i])
+        return it
+
+    def seleccionar(self, indices) -> "ItemsCompactos":
+        indices = list(indices)
+        out = ItemsCompactos()
+        for c in COLS_TEXTO:
+            col = self.texto[c]
+            out.texto[c] = [col[i] for i in indices]
+        for c in COLS_ESTADO:
+            col = self.estado[c]
+            out.estado[c] = array("b", [col[i] for i in indices])
+        for c in COLS_FECHA:
+            col = self.fecha[c]
+            out.fecha[c] = array("q", [col[i] for i in indices])
+        return out
+
+    def fechas_dt(self, c: str) -> np.ndarray:
+        # Vista sin copia: SIN_FECHA se interpreta como NaT
+        return np.frombuffer(self.fecha[c], dtype=np.int64).astype("datetime64[D]")
+
+    def a_dataframe(self) -> pd.DataFrame:
+        data = {c: self.texto[c] for c in COLS_TEXTO}
+        for c in COLS_ESTADO:
+            data[c] = pd.Categorical.from_codes(np.frombuffer(self.estado[c], dtype=np.int8), categories=ESTADOS_ORDEN)
+        for c in COLS_FECHA:
+            data[c] = self.fechas_dt(c)
+        return pd.DataFrame(data)
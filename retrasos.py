@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from items_compactos import SIN_FECHA
+
+# =========================
+# RETRASOS DE PROVEEDORES
+# =========================
+# Retraso = fecha de llegada - fecha prometida (días; negativo = antes).
+# Solo cuentan partidas con ambas fechas. Se calcula al cargar el Excel y
+# se guarda ya resumido: el dashboard no vuelve a leer los items.
+#   {"proyecto": {n, p50, p90, promedio, a_tiempo_pct, histograma},
+#    "por_oc": {"no_oc": [...], "n": [...], "p50": [...], ...}}
+
+RANGOS_RETRASO = [
+    ("Antes", -np.inf, -1),
+    ("A tiempo", 0, 0),
+    ("1-7 días", 1, 7),
+    ("8-14 días", 8, 14),
+    ("15-30 días", 15, 30),
+    ("> 30 días", 31, np.inf),
+]
+COLS_POR_OC = ["no_oc", "n", "p50", "p90", "max", "a_tiempo_pct"]
+
+
+def _r1(x) -> float:
+    return round(float(x), 1)
+
+
+def resumen_retrasos(retraso: np.ndarray) -> dict:
+    if not len(retraso):
+        return {"n": 0}
+    return {
+        "n": int(len(retraso)),
+        "p50": _r1(np.percentile(retraso, 50)),
+        "p90": _r1(np.percentile(retraso, 90)),
+        "promedio": _r1(retraso.mean()),
+        "a_tiempo_pct": _r1((retraso <= 0).mean() * 100),
+        "histograma": {
+            "etiquetas": [r[0] for r in RANGOS_RETRASO],
+            "conteos": [int(((retraso >= lo) & (retraso <= hi)).sum()) for _, lo, hi in RANGOS_RETRASO],
+        },
+    }
+
+
+def analizar_retrasos(items) -> dict:
+    prom = np.frombuffer(items.fecha["fecha_prometida"], dtype=np.int64)
+    lleg = np.frombuffer(items.fecha["fecha_llegada"], dtype=np.int64)
+    ok = (prom != SIN_FECHA) & (lleg != SIN_FECHA)
+    retraso = lleg[ok] - prom[ok]
+
+    df = pd.DataFrame({"no_oc": np.asarray(items.texto["no_oc"], dtype=object)[ok], "retraso": retraso})
+    df = df[~df["no_oc"].isin(["", "0"])]
+    por_oc = {c: [] for c in COLS_POR_OC}
+    if not df.empty:
+        df["a_tiempo"] = df["retraso"] <= 0
+        g = df.groupby("no_oc", sort=False)
+        tabla = pd.DataFrame({
+            "n": g["retraso"].size(),
+            "p50": g["retraso"].quantile(0.5),
+            "p90": g["retraso"].quantile(0.9),
+            "max": g["retraso"].max(),
+            "a_tiempo_pct": g["a_tiempo"].mean() * 100,
+        }).sort_values(["p90", "n"], ascending=False)
+        por_oc = {
+            "no_oc": tabla.index.tolist(),
+            "n": tabla["n"].astype(int).tolist(),
+            "p50": tabla["p50"].round(1).tolist(),
+            "p90": tabla["p90"].round(1).tolist(),
+            "max": tabla["max"].astype(int).tolist(),
+            "a_tiempo_pct": tabla["a_tiempo_pct"].round(1).tolist(),
+        }
+
+    return {"proyecto": resumen_retrasos(retraso), "por_oc": por_oc}
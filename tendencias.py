@@ -0,0 +1,93 @@
+import numpy as np
+
+from items_compactos import SIN_FECHA
+
+# =========================
+# TENDENCIAS PRECALCULADAS
+# =========================
+# Al cargar el Excel se agrupan las partidas por día / semana / mes, por
+# fecha prometida y por fecha de llegada, separadas por estado general.
+# Se guarda por columnas:
+#   {"semana": {"prometida": {"inicio": [días], "conteos": {clase: [n, ...]}}}}
+# La gráfica solo lee estos conteos, nunca los items.
+
+CLASES_GENERALES = ["COMPLETADO", "PENDIENTE A LLEGAR", "SIN OC", "CANCELADO"]
+GRANULARIDADES = ["dia", "semana", "mes"]
+SERIES_FECHA = {"prometida": "fecha_prometida", "llegada": "fecha_llegada"}
+MAX_BUCKETS_RELLENO = 2000   # más que esto (fechas muy lejanas): solo vecinos en 0
+
+
+def inicio_bucket(dias: np.ndarray, granularidad: str) -> np.ndarray:
+    if granularidad == "dia":
+        return dias
+    if granularidad == "semana":
+        # Semana que termina en lunes (igual que pd.Grouper(freq="W-MON")); 1970-01-01 fue jueves
+        return dias + (7 - (dias + 3) % 7) % 7
+    if granularidad == "mes":
+        return dias.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    raise ValueError(f"Granularidad desconocida: {granularidad}")
+
+
+def desplazar_bucket(inicio: np.ndarray, granularidad: str, paso: int) -> np.ndarray:
+    if granularidad == "dia":
+        return inicio + paso
+    if granularidad == "semana":
+        return inicio + 7 * paso
+    if granularidad == "mes":
+        meses = inicio.astype("datetime64[D]").astype("datetime64[M]") + paso
+        return meses.astype("datetime64[D]").astype(np.int64)
+    raise ValueError(f"Granularidad desconocida: {granularidad}")
+
+
+def rango_buckets(primero: int, ultimo: int, granularidad: str) -> np.ndarray:
+    if granularidad == "mes":
+        d = np.array([primero, ultimo], dtype="datetime64[D]").astype("datetime64[M]")
+        return np.arange(d[0], d[1] + 1).astype("datetime64[D]").astype(np.int64)
+    return np.arange(primero, ultimo + 1, 7 if granularidad == "semana" else 1, dtype=np.int64)
+
+
+def con_ceros(datos: dict, granularidad: str) -> dict:
+    # Los buckets sin items no se guardan; para la línea se agregan en 0 entre
+    # el primero y el último (como pd.Grouper) para que no cruce los huecos.
+    # Si el rango es enorme solo se agregan los vecinos de cada bucket.
+    inicio = np.asarray(datos.get("inicio", []), dtype=np.int64)
+    if len(inicio) < 2:
+        return datos
+    todos = rango_buckets(int(inicio[0]), int(inicio[-1]), granularidad)
+    if len(todos) > MAX_BUCKETS_RELLENO:
+        vecinos = np.concatenate([desplazar_bucket(inicio, granularidad, p) for p in (-1, 1)])
+        todos = np.union1d(inicio, vecinos[(vecinos > inicio[0]) & (vecinos < inicio[-1])])
+    if len(todos) == len(inicio):
+        return datos
+    pos = np.searchsorted(todos, inicio)
+    conteos = {}
+    for c, v in datos.get("conteos", {}).items():
+        col = np.zeros(len(todos), dtype=np.int64)
+        col[pos] = v
+        conteos[c] = col.tolist()
+    return {"inicio": todos.tolist(), "conteos": conteos}
+
+
+def agrupar(dias: np.ndarray, clases: np.ndarray, granularidad: str) -> dict:
+    ok = dias != SIN_FECHA
+    inicio = inicio_bucket(dias[ok], granularidad)
+    n_clases = len(CLASES_GENERALES)
+    claves, conteos = np.unique(inicio * n_clases + clases[ok], return_counts=True)
+    buckets = np.unique(inicio)
+    tabla = np.zeros((len(buckets), n_clases), dtype=np.int64)
+    tabla[np.searchsorted(buckets, claves // n_clases), claves % n_clases] = conteos
+    return {
+        "inicio": buckets.tolist(),
+        "conteos": {c: tabla[:, j].tolist() for j, c in enumerate(CLASES_GENERALES)},
+    }
+
+
+def construir_tendencias(items, clases: list) -> dict:
+    codigos = np.array([CLASES_GENERALES.index(c) for c in clases], dtype=np.int64)
+    out = {}
+    for g in GRANULARIDADES:
+        out[g] = {}
+        for serie, col in SERIES_FECHA.items():
+            dias = np.frombuffer(items.fecha[col], dtype=np.int64)
+            out[g][serie] = agrupar(dias, codigos, g)
+    return out
@@ -0,0 +1,285 @@
+"""Resumen diario de partidas vencidas en todos los proyectos (CSV + HTML).
+
+Se corre aparte del dashboard (cron / tarea programada) sobre la misma BD:
+
+    python vencidos.py --db db_proyectos.json --salida resumen_vencidos
+
+Al guardar, el dashboard publica junto a la BD (db_proyectos_colas/) un
+manifiesto {nombre: versión} y, por cada proyecto que cambió, su cola de
+partidas abiertas ordenada por fecha prometida (publicar_colas). El job
+guarda en vencidos_estado.json esas colas y la marca del último día
+evaluado; cada corrida solo saca lo que venció entre la marca y hoy. Si
+la BD cambió lee el manifiesto y solo las colas con otra versión, nunca
+la BD completa. Solo una BD sin colas (de antes, o escrita por otro
+medio) se lee entera una vez para publicarlas. La primera vez que se ve
+un proyecto salen todas sus partidas ya vencidas.
+"""
+import os
+import json
+import html
+import hashlib
+import argparse
+import datetime as dt
+from bisect import bisect_left
+from itertools import groupby
+
+import numpy as np
+
+from items_compactos import ItemsCompactos, CODIGO_ESTADO, SIN_FECHA, EPOCA, desde_dias_epoca, hoy_dias_epoca
+from exportar import escribir_csv
+
+DB_FILE = "db_proyectos.json"
+ESTADO_FILE = "vencidos_estado.json"
+MANIFIESTO = "manifiesto.json"
+SALIDA_DIR = "resumen_vencidos"
+COLS_COLA = ["prometida", "no_oc", "no_sc", "titulo", "descripcion"]
+ENCABEZADO_VENCIDOS = [
+    "Proyecto", "No. O.C.", "No. S.C.", "Título", "Descripción", "Fecha prometida", "Días vencido",
+]
+SIN_OC = "Sin O.C."
+
+
+def _firma(ruta: str):
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _leer_json(ruta: str):
+    # None si no existe o está a medio escribir
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_json(ruta: str, obj):
+    tmp = ruta + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        # dumps y no dump: dump no usa el codificador en C
+        f.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+    os.replace(tmp, ruta)
+
+
+def dir_colas(db: str) -> str:
+    return os.path.splitext(db)[0] + "_colas"
+
+
+def _version(p: dict) -> str:
+    # Con el número de items: el dedup del admin no cambia fecha_carga
+    items = p.get("resumen", {}).get("items", [])
+    n = len(items.get("no_sc", [])) if isinstance(items, dict) else len(items)
+    return f"{p.get('id', '')}|{p.get('fecha_carga', '')}|{n}"
+
+
+def _archivo_cola(nombre: str) -> str:
+    return hashlib.sha1(nombre.encode("utf-8")).hexdigest()[:16] + ".json"
+
+
+def _base_libre(salida: str, fecha: str) -> str:
+    # Otra corrida el mismo día agrega _2, _3...: sus partidas ya salieron de
+    # las colas, así que su resumen no se puede pisar
+    base = os.path.join(salida, f"vencidos_{fecha}")
+    n = 1
+    while os.path.exists(base + ".csv") or os.path.exists(base + ".html"):
+        n += 1
+        base = os.path.join(salida, f"vencidos_{fecha}_{n}")
+    return base
+
+
+def cola_abiertos(items: ItemsCompactos, marca) -> dict:
+    # Abiertas: con fecha prometida, sin llegada, ni canceladas ni completadas
+    # (mismas clases que la dona). Lo anterior a la marca ya se evaluó.
+    prom = np.frombuffer(items.fecha["fecha_prometida"], dtype=np.int64)
+    lleg = np.frombuffer(items.fecha["fecha_llegada"], dtype=np.int64)
+    cerrado = [CODIGO_ESTADO["CANCELADO"], CODIGO_ESTADO["COMPLETADO"]]
+    ok = (prom != SIN_FECHA) & (lleg == SIN_FECHA)
+    for c in ["estatus_sc", "estatus_oc"]:
+        ok &= ~np.isin(np.frombuffer(items.estado[c], dtype=np.int8), cerrado)
+    if marca is not None:
+        ok &= prom >= marca
+    idx = np.flatnonzero(ok)
+    idx = idx[np.argsort(prom[idx], kind="stable")].tolist()
+    cola = {"prometida": prom[idx].tolist()}
+    for c in COLS_COLA[1:]:
+        col = items.texto[c]
+        cola[c] = [col[i] for i in idx]
+    return cola
+
+
+def publicar_colas(proyectos, db: str = DB_FILE, firma=None) -> int:
+    # -> colas escritas. Se llama después de escribir la BD; solo se
+    # rearman los proyectos con otra versión que la del manifiesto anterior.
+    carpeta = dir_colas(db)
+    os.makedirs(carpeta, exist_ok=True)
+    previo = (_leer_json(os.path.join(carpeta, MANIFIESTO)) or {}).get("proyectos", {})
+    manifiesto, escritas = {}, 0
+    for p in proyectos:
+        nombre = p.get("nombre", "")
+        ent = {"version": _version(p), "archivo": _archivo_cola(nombre)}
+        manifiesto[nombre] = ent
+        ruta = os.path.join(carpeta, ent["archivo"])
+        if previo.get(nombre, {}).get("version") == ent["version"] and os.path.exists(ruta):
+            continue
+        items = ItemsCompactos.desde_json(p.get("resumen", {}).get("items", []))
+        _escribir_json(ruta, {"version": ent["version"], "cola": cola_abiertos(items, None)})
+        escritas += 1
+    for nombre, ent in previo.items():
+        if nombre not in manifiesto:
+            try:
+                os.remove(os.path.join(carpeta, ent["archivo"]))
+            except OSError:
+                pass
+    # La firma de la BD dice de qué archivo salió el manifiesto
+    _escribir_json(os.path.join(carpeta, MANIFIESTO), {
+        "bd": _firma(db) if firma is None else firma, "proyectos": manifiesto,
+    })
+    return escritas
+
+
+class EstadoVencidos:
+    """Colas por proyecto: {nombre: {"version", "marca", "cola": {columna: [...]}}}."""
+
+    def __init__(self, ruta: str = ESTADO_FILE):
+        self.ruta = ruta
+        self.bd = None
+        self.proyectos = {}
+        if os.path.exists(ruta):
+            try:
+                with open(ruta, "r", encoding="utf-8") as f:
+                    datos = json.load(f)
+                self.bd, self.proyectos = datos.get("bd"), datos.get("proyectos", {})
+            except (OSError, ValueError):
+                self.bd, self.proyectos = None, {}
+
+    def guardar(self):
+        _escribir_json(self.ruta, {"bd": self.bd, "proyectos": self.proyectos})
+
+    def sincronizar(self, db: str) -> int:
+        # -> colas leídas; BD sin cambios (misma firma) = 0 sin leer nada
+        firma = _firma(db)
+        if firma is None or firma == self.bd:
+            return 0
+        carpeta = dir_colas(db)
+        manifiesto = _leer_json(os.path.join(carpeta, MANIFIESTO))
+        if manifiesto is None or manifiesto.get("bd") != firma:
+            # BD sin colas publicadas o escrita por otro medio: se publican desde ella
+            proyectos = _leer_json(db)
+            if proyectos is None:
+                return 0   # BD a medio escribir: se conserva el estado y se reintenta en la próxima
+            publicar_colas(proyectos, db, firma)
+            manifiesto = _leer_json(os.path.join(carpeta, MANIFIESTO))
+            if manifiesto is None:
+                return 0
+
+        nuevos, leidas, pendiente = {}, 0, False
+        for nombre, ent in manifiesto.get("proyectos", {}).items():
+            previo = self.proyectos.get(nombre)
+            if previo is not None and previo["version"] == ent["version"]:
+                nuevos[nombre] = previo
+                continue
+            datos = _leer_json(os.path.join(carpeta, ent["archivo"]))
+            if datos is None or datos.get("version") != ent["version"]:
+                # El dashboard la está reescribiendo: se reintenta en la próxima
+                pendiente = True
+                if previo is not None:
+                    nuevos[nombre] = previo
+                continue
+            marca = previo["marca"] if previo is not None else None
+            cola = datos["cola"]
+            if marca is not None:
+                k = bisect_left(cola["prometida"], marca)
+                cola = {c: v[k:] for c, v in cola.items()}
+            nuevos[nombre] = {"version": ent["version"], "marca": marca, "cola": cola}
+            leidas += 1
+        self.proyectos = nuevos   # proyectos borrados de la BD salen del estado
+        self.bd = None if pendiente else firma
+        return leidas
+
+    def evaluar(self, hoy: int) -> list:
+        # Saca de cada cola lo que venció en [marca, hoy) y avanza la marca
+        filas = []
+        for nombre, p in self.proyectos.items():
+            cola = p["cola"]
+            k = bisect_left(cola["prometida"], hoy)
+            for prom, no_oc, no_sc, titulo, desc in zip(*(cola[c][:k] for c in COLS_COLA)):
+                filas.append((nombre, no_oc or SIN_OC, no_sc, titulo, desc, desde_dias_epoca(prom), hoy - prom))
+            if k:
+                for c in COLS_COLA:
+                    del cola[c][:k]
+            p["marca"] = hoy if p["marca"] is None else max(p["marca"], hoy)
+        filas.sort(key=lambda f: (f[0], f[1], f[5]))
+        return filas
+
+
+# =========================
+# RESUMEN (CSV / HTML)
+# =========================
+def escribir_html(destino, filas: list, hoy: int):
+    fecha = desde_dias_epoca(hoy).strftime("%d/%m/%Y")
+    e = html.escape
+    partes = [
+        "<!DOCTYPE html>\n<html lang=\"es\"><head><meta charset=\"utf-8\">",
+        f"<title>Partidas vencidas {fecha}</title>",
+        "<style>body{font-family:sans-serif;color:#0F172A}"
+        "table{border-collapse:collapse;margin-bottom:12px}"
+        "th,td{border:1px solid #CBD5E1;padding:4px 8px;text-align:left}"
+        "th{background:#F1F5F9}td.n{text-align:right}</style></head><body>",
+        f"<h1>Partidas vencidas al {fecha}</h1>",
+        f"<p>{len(filas)} partidas vencieron desde la evaluación anterior.</p>",
+    ]
+    for proyecto, por_proyecto in groupby(filas, key=lambda f: f[0]):
+        por_proyecto = list(por_proyecto)
+        partes.append(f"<h2>{e(proyecto)} ({len(por_proyecto)})</h2>")
+        for no_oc, por_oc in groupby(por_proyecto, key=lambda f: f[1]):
+            partes.append(f"<h3>O.C. {e(no_oc)}</h3><table><tr>")
+            partes.extend(f"<th>{e(h)}</th>" for h in ENCABEZADO_VENCIDOS[2:])
+            partes.append("</tr>")
+            for _, _, no_sc, titulo, desc, prom, dias in por_oc:
+                partes.append(
+                    f"<tr><td>{e(no_sc)}</td><td>{e(titulo)}</td><td>{e(desc)}</td>"
+                    f"<td>{prom.strftime('%d/%m/%Y')}</td><td class=\"n\">{dias}</td></tr>"
+                )
+            partes.append("</table>")
+    partes.append("</body></html>\n")
+    destino.write("".join(partes).encode("utf-8"))
+
+
+def generar_resumen(db: str = DB_FILE, estado: str = ESTADO_FILE, salida: str = SALIDA_DIR, hoy: int = None) -> dict:
+    hoy = hoy_dias_epoca() if hoy is None else hoy
+    ev = EstadoVencidos(estado)
+    rearmados = ev.sincronizar(db)
+    filas = ev.evaluar(hoy)
+
+    archivos = []
+    if filas:
+        # Primero el resumen y después el estado: si algo falla a medio camino
+        # la siguiente corrida repite partidas en lugar de perderlas
+        os.makedirs(salida, exist_ok=True)
+        base = _base_libre(salida, desde_dias_epoca(hoy).isoformat())
+        with open(base + ".csv", "xb") as f:
+            escribir_csv(f, ENCABEZADO_VENCIDOS, filas)
+        with open(base + ".html", "xb") as f:
+            escribir_html(f, filas, hoy)
+        archivos = [base + ".csv", base + ".html"]
+    ev.guardar()
+    return {"vencidos": len(filas), "proyectos": len(ev.proyectos), "rearmados": rearmados, "archivos": archivos}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Resumen de partidas vencidas desde la corrida anterior")
+    ap.add_argument("--db", default=DB_FILE)
+    ap.add_argument("--estado", default=ESTADO_FILE)
+    ap.add_argument("--salida", default=SALIDA_DIR)
+    ap.add_argument("--hoy", help="fecha de evaluación YYYY-MM-DD (por defecto hoy)")
+    args = ap.parse_args()
+
+    hoy = (dt.date.fromisoformat(args.hoy) - EPOCA).days if args.hoy else None
+    res = generar_resumen(args.db, args.estado, args.salida, hoy)
+    print(f"{res['vencidos']} partidas vencidas en {res['proyectos']} proyectos "
+          f"({res['rearmados']} colas actualizadas)")
+    for ruta in res["archivos"]:
+        print(ruta)